@@ -1,41 +1,7 @@
 import streamlit as st
-import yfinance as yf
 from PIL import Image
 from datetime import datetime
-
-# Fetch live market data using yfinance
-def get_market_data():
-    tickers = {
-        "S&P 500": "^GSPC",
-        "NASDAQ": "^IXIC",
-        "DOW JONES": "^DJI",
-       
-    }
-
-    try:
-        data = yf.download(list(tickers.values()), period="1d", interval="1m", group_by="ticker")
-        if data.empty:
-            # fallback if data unavailable
-            data = yf.download(list(tickers.values()), period="5d", interval="1d", group_by="ticker")
-    except:
-        return {k: {'last': 'N/A', 'change': 'N/A', 'status': 'neutral'} for k in tickers.keys()}
-
-    latest_data = {}
-    for name, symbol in tickers.items():
-        try:
-            df = data[symbol]
-            last = df['Close'].dropna().iloc[-1]
-            prev = df['Close'].dropna().iloc[-5]
-            change = ((last - prev) / prev) * 100
-            latest_data[name] = {
-                'last': round(last, 2),
-                'change': round(change, 2),
-                'status': 'up' if change > 0 else 'down'
-            }
-        except:
-            latest_data[name] = {'last': 'N/A', 'change': 'N/A', 'status': 'neutral'}
-    return latest_data
-
+from pages.utils.index_feed import get_index_snapshot, REFRESH_SECONDS
 
 # Streamlit configuration
 st.set_page_config(page_title="EquiNova", page_icon="🌠", layout="wide")
@@ -126,18 +92,30 @@ except:
 
 # Live Market Overview (moved below image)
 st.markdown("## 🚦 TradeSignals")
-market_data = get_market_data()
-col1, col2, col3, col4 = st.columns(4)
-cols = [col1, col2, col3, col4]
-
-for idx, (name, details) in enumerate(market_data.items()):
-    with cols[idx]:
-        st.markdown(f"<div class='stat-card'>"
-                    f"<div>{name}</div>"
-                    f"<div class='stat-value'>{details['last']}</div>"
-                    f"<div class='{'stat-change-up' if details['status']=='up' else 'stat-change-down'}'>"
-                    f"{'🔺' if details['status']=='up' else '🔻'} {details['change']}%"
-                    f"</div></div>", unsafe_allow_html=True)
+
+
+# index quotes come from a process-wide snapshot refreshed in the background;
+# the cards re-read it on their own timer, without rerunning the rest of the page
+@st.fragment(run_every=REFRESH_SECONDS)
+def trade_signals():
+    snapshot = get_index_snapshot()
+    market_data = snapshot['cards']
+    col1, col2, col3, col4 = st.columns(4)
+    cols = [col1, col2, col3, col4]
+
+    for idx, (name, details) in enumerate(market_data.items()):
+        with cols[idx]:
+            st.markdown(f"<div class='stat-card'>"
+                        f"<div>{name}</div>"
+                        f"<div class='stat-value'>{details['last']}</div>"
+                        f"<div class='{'stat-change-up' if details['status']=='up' else 'stat-change-down'}'>"
+                        f"{'🔺' if details['status']=='up' else '🔻'} {details['change']}%"
+                        f"</div></div>", unsafe_allow_html=True)
+    if snapshot['age'] is not None:
+        st.caption(f"Quotes updated {int(snapshot['age'])}s ago")
+
+
+trade_signals()
 
 # Our Services
 st.markdown("## 🌟Key Offerings")
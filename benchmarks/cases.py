@@ -0,0 +1,141 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from pages.utils.providers import SyntheticProvider
+from pages.utils import model_train, plotly_figure, stationarity
+from pages.utils.anomaly import zscore_frame, rolling_zscore, WINDOW
+
+# Benchmark cases for the forecasting, anomaly and charting hot paths.
+# Every case is built on a synthetic daily series of the requested length (no
+# network, same bars on every run). A case is a setup function that takes the
+# series and returns the zero-argument callable to time. Checks compare a fast
+# kernel with its reference implementation before anything is timed.
+SIZES = (1_000, 10_000, 100_000)
+# ARIMA(30, d, 30), the page default, takes tens of seconds per fit at 1k bars
+# already, so the default-order cases only run at this size and below
+HIGH_ORDER_MAX_BARS = 1_000
+SMALL_ORDER = (2, 1, 2)
+SEED = 0
+CALENDAR_START = '1800-01-01'
+
+
+def make_prices(n_bars, seed=SEED):
+    bars = SyntheticProvider(seed=seed).generate_bars('BENCH', n_bars)
+    # weekdays from 1800 on: 100k bars end around 2183, inside the datetime64[ns] range
+    # (pd.bdate_range overflows building an offset that large)
+    days = np.busday_offset(CALENDAR_START, np.arange(n_bars), roll='forward')
+    bars.index = pd.DatetimeIndex(days.astype('datetime64[ns]'), name='Date')
+    return bars[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+
+def _rolling(prices):
+    return model_train.get_rolling_mean(prices[['Close']])
+
+
+def _scaled(prices):
+    return model_train.scaling(_rolling(prices))[0]
+
+
+def _quiet(fn):
+    def run():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return fn()
+    return run
+
+
+def _forecast_combined(prices):
+    rolling = _rolling(prices)
+    forecast = model_train.forecast_frame(rolling['Close'].values[-30:])
+    combined = pd.concat([rolling, forecast])
+    return combined.iloc[max(0, len(combined) - 180):]
+
+
+def _memoized_differencing_order(prices):
+    model_train.get_differencing_order(_rolling(prices))
+    return lambda: model_train.get_differencing_order(_rolling(prices))
+
+
+# name -> (setup, largest size it runs at or None)
+CASES = {
+    # the setup runs the ADF search once, so this is the memoized rerun cost; the uncached case times the search
+    'model_train.get_differencing_order': (lambda p: _memoized_differencing_order(p), None),
+    'stationarity.analyze[uncached]': (
+        lambda p: lambda r=_rolling(p): stationarity.analyze(r, use_cache=False), None),
+    'model_train.scaling': (lambda p: lambda: model_train.scaling(_rolling(p)), None),
+    'model_train.fit_model[small_order]': (
+        lambda p: _quiet(lambda s=_scaled(p): model_train.fit_model(s, 1, order=SMALL_ORDER)), None),
+    'model_train.ForecastPipeline[small_order]': (
+        lambda p: _quiet(lambda s=_scaled(p): model_train.ForecastPipeline(s, 1, order=SMALL_ORDER).fit().forecast()),
+        None),
+    'model_train.fit_model[default_order]': (
+        lambda p: _quiet(lambda s=_scaled(p): model_train.fit_model(s, 1)), HIGH_ORDER_MAX_BARS),
+    'model_train.evaluate_model': (
+        lambda p: _quiet(lambda s=_scaled(p): model_train.evaluate_model(s, 1)), HIGH_ORDER_MAX_BARS),
+    'model_train.get_forecast': (
+        lambda p: _quiet(lambda s=_scaled(p): model_train.get_forecast(s, 1)), HIGH_ORDER_MAX_BARS),
+    'model_train.monte_carlo_forecast[gbm]': (
+        lambda p: lambda r=_rolling(p): model_train.monte_carlo_forecast(r, method='gbm'), None),
+    'model_train.monte_carlo_forecast[bootstrap]': (
+        lambda p: lambda r=_rolling(p): model_train.monte_carlo_forecast(r, method='bootstrap'), None),
+    'trade_alert.zscore_frame': (lambda p: lambda: zscore_frame(p[['Close']]), None),
+    'plotly_figure.filter_data[1y]': (lambda p: lambda: plotly_figure.filter_data(p, '1y'), None),
+}
+
+# figure builders, each timed on its own and together with JSON serialisation (what Streamlit sends)
+FIGURES = {
+    'plotly_table': lambda p: (lambda t=p.tail(10).round(2): plotly_figure.plotly_table(t)),
+    'close_chart': lambda p: lambda: plotly_figure.close_chart(p, 'max'),
+    'candlestick': lambda p: lambda: plotly_figure.candlestick(p, 'max'),
+    'RSI': lambda p: lambda: plotly_figure.RSI(p, 'max'),
+    'MACD': lambda p: lambda: plotly_figure.MACD(p, 'max'),
+    'Moving_average': lambda p: lambda: plotly_figure.Moving_average(p, 'max'),
+    'Moving_average_forecast': lambda p: (lambda c=_forecast_combined(p): plotly_figure.Moving_average_forecast(c)),
+}
+
+
+def _with_json(build):
+    return lambda: pio.to_json(build(), validate=False)
+
+
+for _name, _setup in FIGURES.items():
+    CASES[f'plotly_figure.{_name}'] = (_setup, None)
+    CASES[f'plotly_figure.{_name}+json'] = (lambda p, setup=_setup: _with_json(setup(p)), None)
+
+
+def cases_for(n_bars, names=None):
+    # (name, setup) pairs that run at n_bars
+    for name, (setup, max_bars) in CASES.items():
+        if names is not None and name not in names:
+            continue
+        if max_bars is None or n_bars <= max_bars:
+            yield name, setup
+
+
+def trending_closes(n_bars, seed=SEED):
+    # a long uptrend (0.02 -> 5,000) with 1% daily noise: sums carried over the whole series lose
+    # the precision a 20-bar window needs at the top of it
+    rng = np.random.default_rng(seed)
+    return np.geomspace(0.02, 5000, n_bars) * np.exp(rng.normal(0, 0.01, n_bars))
+
+
+def _check_rolling_zscore(n_bars):
+    values = trending_closes(n_bars)
+    zscore = rolling_zscore(values)[2][:, 0]
+    rolling = pd.Series(values).rolling(WINDOW)
+    expected = (values - rolling.mean().values) / rolling.std().values
+    return float(np.nanmax(np.abs(zscore - expected)))
+
+
+# name -> (function of the size returning the largest deviation from the reference, tolerance)
+CHECKS = {
+    'anomaly.rolling_zscore vs pandas rolling': (_check_rolling_zscore, 1e-6),
+}
+
+
+def checksum(prices):
+    # identifies the generated data in the baseline so a changed generator is not read as a regression
+    return f"{float(np.nansum(prices['Close'].values)):.6e}"
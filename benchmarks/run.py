@@ -0,0 +1,157 @@
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import shutil
+import platform
+import argparse
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.startup import scratch_caches
+
+# the page modules read their cache locations on import, so the scratch caches are set up first
+_SCRATCH_DIR = tempfile.mkdtemp(prefix='equinova-bench-')
+atexit.register(shutil.rmtree, _SCRATCH_DIR, ignore_errors=True)
+os.environ.update(scratch_caches(_SCRATCH_DIR))
+
+from benchmarks.cases import SIZES, CHECKS, make_prices, cases_for, checksum
+
+# Runs the benchmark cases and compares them with a stored baseline:
+#   python -m benchmarks.run --save-baseline    record the baseline
+#   python -m benchmarks.run                    compare, exit 1 on a regression
+# The checks in cases.CHECKS run first and compare fast kernels with their
+# reference implementations; a failed check exits 1 before any comparison.
+# The pages' on-disk caches live in a scratch directory for the run, so memoized
+# cases start from the state their setup builds, not from the tree's .equinova.
+# Each case reports the best per-call time over REPEATS repeats. A case counts
+# as a regression when it is slower than the baseline by more than --threshold
+# (relative) and by more than --min-delta seconds (absolute, filters timer noise).
+BENCH_DIR = os.environ.get("EQUINOVA_BENCH_DIR", os.path.join(".equinova", "benchmarks"))
+REPEATS = 5
+# total time budget per case; slow cases run once
+CASE_BUDGET = 1.0
+
+
+def measure(fn):
+    started = time.perf_counter()
+    fn()
+    first = time.perf_counter() - started
+    if first * REPEATS > CASE_BUDGET:
+        return first
+    number = max(1, int(CASE_BUDGET / REPEATS / max(first, 1e-6)))
+    best = first
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def run(sizes=SIZES, pattern=None, log=print):
+    results = {}
+    checks = {}
+    data = {}
+    for n_bars in sizes:
+        for name, (check, tolerance) in CHECKS.items():
+            deviation = check(n_bars)
+            checks.setdefault(name, {})[str(n_bars)] = {'deviation': deviation, 'ok': deviation <= tolerance}
+            log(f"{name:<48} {n_bars:>7} bars  max deviation {deviation:.2e} "
+                f"{'ok' if deviation <= tolerance else f'FAILED (tolerance {tolerance:.0e})'}")
+        prices = make_prices(n_bars)
+        data[str(n_bars)] = checksum(prices)
+        for name, setup in cases_for(n_bars):
+            if pattern and not re.search(pattern, name):
+                continue
+            seconds = measure(setup(prices))
+            results.setdefault(name, {})[str(n_bars)] = seconds
+            log(f"{name:<48} {n_bars:>7} bars {seconds * 1000:>11.3f} ms")
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(), 'machine': platform.machine(),
+            'numpy': np.__version__, 'pandas': pd.__version__,
+        },
+        'data': data,
+        'checks': checks,
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.25, min_delta=0.002):
+    rows = []
+    for name, by_size in current['results'].items():
+        for size, seconds in by_size.items():
+            base = baseline['results'].get(name, {}).get(size)
+            if base is None or baseline.get('data', {}).get(size) != current['data'].get(size):
+                continue
+            ratio = seconds / base if base else float('inf')
+            regressed = ratio > 1 + threshold and seconds - base > min_delta
+            rows.append({'case': name, 'bars': int(size), 'baseline': base, 'current': seconds,
+                         'ratio': ratio, 'regressed': regressed})
+    return rows
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the forecasting and charting hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="series lengths in bars")
+    parser.add_argument('--only', help="regex selecting the cases to run")
+    parser.add_argument('--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="ignore slowdowns below this many seconds")
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.only)
+    _write(os.path.join(BENCH_DIR, 'latest.json'), current)
+    failed = [f"{name} at {size} bars" for name, by_size in current['checks'].items()
+              for size, check in by_size.items() if not check['ok']]
+    if failed:
+        # a kernel that disagrees with its reference makes its timings meaningless
+        print("checks failed: " + ", ".join(failed))
+        return 1
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            # keep the cases and sizes this run skipped
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            for name, by_size in previous['results'].items():
+                for size, seconds in by_size.items():
+                    if previous.get('data', {}).get(size) == current['data'].get(size, previous['data'].get(size)):
+                        current['results'].setdefault(name, {}).setdefault(size, seconds)
+            current['data'] = dict(previous.get('data', {}), **current['data'])
+        _write(args.baseline, current)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold, args.min_delta)
+    print()
+    for row in rows:
+        flag = 'REGRESSION' if row['regressed'] else ''
+        print(f"{row['case']:<48} {row['bars']:>7} bars {row['baseline'] * 1000:>11.3f} -> "
+              f"{row['current'] * 1000:>11.3f} ms  x{row['ratio']:.2f} {flag}")
+    regressions = [row for row in rows if row['regressed']]
+    print(f"\n{len(rows)} cases compared, {len(regressions)} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import os
+import re
+import ast
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+# Cold-start report for the app:
+#   python -m benchmarks.startup
+# For every page, a fresh interpreter under `python -X importtime` first
+# imports the framework every page loads (Streamlit, pandas, NumPy), then the
+# page's module-level imports. importtime only reports first-time imports, so
+# what follows the framework is the page's own import cost, per top-level
+# package (best of IMPORT_REPEATS). The import budget applies to that cost,
+# which leaves the machine-dependent framework time out of it.
+# A second fresh interpreter then boots Streamlit's test runner and executes
+# the page once against the synthetic provider (boot + first render), with
+# every cache pointed at a temporary directory. Both numbers are checked
+# against a budget; the command exits 1 when a page is over budget.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.environ.get("EQUINOVA_BENCH_DIR", os.path.join(".equinova", "benchmarks"))
+PAGES = ['Trading_App.py', 'pages/Market_Pulse.py', 'pages/Price_Forecast.py', 'pages/Trade_Alert.py',
+         'pages/Screener.py']
+FRAMEWORK_IMPORTS = ['import streamlit', 'import pandas', 'import numpy']
+IMPORT_BUDGET_MS = 100
+IMPORT_REPEATS = 3
+RUN_BUDGET_S = 15.0
+TOP_PACKAGES = 8
+
+# every on-disk cache the pages keep, by environment variable and directory name
+CACHE_DIRS = [('EQUINOVA_STORE_DIR', 'prices'), ('EQUINOVA_ORDER_CACHE', 'arima_orders'),
+              ('EQUINOVA_STATIONARITY_CACHE', 'stationarity'), ('EQUINOVA_FORECAST_CACHE', 'forecast_cache'),
+              ('EQUINOVA_PRICE_CACHE_DIR', 'price_cache'), ('EQUINOVA_MODEL_DIR', 'models')]
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+_MARKER = '-- page imports --'
+
+_RUN_PAGE = """
+import sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+booted = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+done = time.perf_counter()
+print(f"{booted - started:.6f} {done - booted:.6f} {len(at.exception)}")
+"""
+
+
+def page_imports(path):
+    # the import statements a page runs at module level
+    with open(os.path.join(ROOT, path)) as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def scratch_caches(directory):
+    # environment pointing every cache at `directory`, so a run neither reads nor fills the tree's caches
+    return {name: os.path.join(directory, sub) for name, sub in CACHE_DIRS}
+
+
+def _environment():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('EQUINOVA_PROVIDER', 'synthetic')
+    return env
+
+
+def _import_times(imports, label):
+    # (framework, page) import times per top-level package, from one interpreter
+    code = '\n'.join(FRAMEWORK_IMPORTS + [f"import sys; print({_MARKER!r}, file=sys.stderr, flush=True)"] + imports)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=_environment(),
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{label}: imports failed\n{proc.stderr[-2000:]}")
+    framework, page = {}, {}
+    packages = framework
+    for line in proc.stderr.splitlines():
+        if line == _MARKER:
+            packages = page
+            continue
+        match = _IMPORTTIME.match(line)
+        if match:
+            package = match.group(4).split('.')[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1))
+    return framework, page
+
+
+def import_report(path, repeats=IMPORT_REPEATS):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        framework, page = _import_times(page_imports(path), path)
+        wall = time.perf_counter() - started
+        if best is None or sum(page.values()) < sum(best[1].values()):
+            best = framework, page, wall
+    framework, page, wall = best
+    top = sorted(page.items(), key=lambda item: -item[1])[:TOP_PACKAGES]
+    return {'imports_ms': sum(page.values()) / 1000, 'framework_ms': sum(framework.values()) / 1000,
+            'process_ms': wall * 1000, 'packages_ms': {name: us / 1000 for name, us in top}}
+
+
+def cold_run(path, store_dir):
+    env = _environment()
+    env.update(scratch_caches(store_dir))
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', _RUN_PAGE, path], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{path}: run failed\n{proc.stderr[-2000:]}")
+    boot, render, exceptions = proc.stdout.split()[-3:]
+    return {'wall_s': wall, 'streamlit_boot_s': float(boot), 'first_run_s': float(render),
+            'exceptions': int(exceptions)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import time and cold first-run time per page.")
+    parser.add_argument('pages', nargs='*', default=PAGES)
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help="allowed page imports after the framework imports")
+    parser.add_argument('--run-budget-s', type=float, default=RUN_BUDGET_S)
+    parser.add_argument('--imports-only', action='store_true', help="skip the cold page runs")
+    args = parser.parse_args(argv)
+
+    report = {'created': datetime.now().isoformat(timespec='seconds'), 'pages': {}}
+    over = []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for path in args.pages:
+            entry = import_report(path)
+            print(f"{path}: imports {entry['imports_ms']:.0f} ms after the framework's {entry['framework_ms']:.0f} ms "
+                  f"(budget {args.import_budget_ms:.0f} ms)")
+            for name, ms in entry['packages_ms'].items():
+                print(f"    {name:<24}{ms:>9.1f} ms")
+            if entry['imports_ms'] > args.import_budget_ms:
+                over.append(f"{path} imports")
+            if not args.imports_only:
+                entry.update(cold_run(path, store_dir))
+                print(f"    cold run: {entry['wall_s']:.2f} s wall, {entry['streamlit_boot_s']:.2f} s Streamlit boot, "
+                      f"{entry['first_run_s']:.2f} s first run (budget {args.run_budget_s:.1f} s)")
+                if entry['wall_s'] > args.run_budget_s or entry['exceptions']:
+                    over.append(f"{path} cold run")
+            report['pages'][path] = entry
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(os.path.join(BENCH_DIR, 'startup.json'), 'w') as f:
+        json.dump(report, f, indent=1)
+    if over:
+        print("over budget: " + ", ".join(over))
+        return 1
+    print("all pages within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
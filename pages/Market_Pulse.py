@@ -1,8 +1,12 @@
 import streamlit as st
-import yfinance as yf
 import datetime
+from dateutil.relativedelta import relativedelta
 import pandas as pd
 from pages.utils.plotly_figure import plotly_table, candlestick, RSI, close_chart, Moving_average, MACD
+from pages.utils.data_store import load_prices
+from pages.utils.fundamentals import get_fundamentals
+from pages.utils.page_loader import PageLoader
+from pages.utils import profiler
 
 # Page config
 st.set_page_config(
@@ -10,6 +14,7 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+profile_run = profiler.start_run("Market Pulse")
 st.markdown("""
     <style>
         html, body, [class*="css"] {
@@ -146,17 +151,26 @@ with col1:
 
 # --- Date Range Selection ---
 with col2:
-    start_date = st.date_input("📅 Start Date", datetime.date(today.year - 1, today.month, today.day))
+    start_date = st.date_input("📅 Start Date", today - relativedelta(years=1))
 with col3:
     end_date = st.date_input("📅 End Date", today)
 
-# --- Company Information Display ---
-st.markdown(f"<h3 class='section-title'>🏢 Company Overview: <span style='color:#1a3669'>{ticker}</span></h3>", unsafe_allow_html=True)
+# -------------------- Data --------------------
+# all fetches start now and run concurrently; each section below renders as soon as its data is in
+loader = PageLoader()
+loader.fetch('info', get_fundamentals, ticker)
+# one price fetch: two load_prices calls on the same ticker would queue on its store lock,
+# so the date range for the table is cut from the full history instead
+loader.fetch('history', load_prices, ticker, period="max")
+
+
+def prices_between(history, start, end):
+    # what load_prices(ticker, start=start, end=end) returns: end is exclusive
+    index = history.index
+    return history[(index >= pd.Timestamp(start)) & (index < pd.Timestamp(end))]
 
-try:
-    stock = yf.Ticker(ticker)
-    info = stock.info
 
+def render_overview(info):
     st.markdown(f"""
         <div style="background-color: #ffffff; padding: 20px; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.05); margin-bottom: 25px;">
             <p style="font-size: 16px; line-height: 1.6; color: #333;">{info.get('longBusinessSummary', 'No summary available.')}</p>
@@ -167,92 +181,124 @@ try:
         </div>
     """, unsafe_allow_html=True)
 
-except Exception as e:
-    st.warning("⚠️ Unable to retrieve company information. Please try a different ticker.")
-
-# -------------------- Financial Metrics --------------------
-st.markdown("<h3 class='section-title'>📈 Financial Metrics</h3>", unsafe_allow_html=True)
-col1, col2 = st.columns(2)
-
-with col1:
-    try:
-        metrics = [
-            ('Market Cap', 'marketCap', lambda x: f"${x:,}" if x else 'N/A'),
-            ('Beta', 'beta', lambda x: round(x, 2) if x else 'N/A'),
-            ('EPS', 'trailingEps', lambda x: round(x, 2) if x else 'N/A'),
-            ('PE Ratio', 'trailingPE', lambda x: round(x, 2) if x else 'N/A')
-        ]
-        values = [formatter(stock.info.get(key)) for _, key, formatter in metrics]
-        df = pd.DataFrame({'Value': values}, index=[label for label, _, _ in metrics])
-        df.index.name = 'Metric'
-        st.plotly_chart(plotly_table(df), use_container_width=True)
-    except Exception as e:
-        st.error(f"Error fetching key metrics: {e}")
 
-with col2:
-    try:
-        df = pd.DataFrame(index=['Quick Ratio', 'Revenue/Share', 'Profit Margins', 'Debt to Equity', 'ROE'])
-        df['Value'] = [
-            stock.info.get("quickRatio", 'N/A'),
-            stock.info.get("revenuePerShare", 'N/A'),
-            stock.info.get("profitMargins", 'N/A'),
-            stock.info.get("debtToEquity", 'N/A'),
-            stock.info.get("returnOnEquity", 'N/A')
-        ]
-        df.index.name = 'Metric'
-        st.plotly_chart(plotly_table(df), use_container_width=True)
-    except:
-        st.warning("Some financial ratios may not be available for this stock.")
+@st.fragment
+def render_metrics(info):
+    col1, col2 = st.columns(2)
 
-# -------------------- Historical Table --------------------
-st.markdown("### Last 10 Days Performance")
+    with col1:
+        try:
+            metrics = [
+                ('Market Cap', 'marketCap', lambda x: f"${x:,}" if x else 'N/A'),
+                ('Beta', 'beta', lambda x: round(x, 2) if x else 'N/A'),
+                ('EPS', 'trailingEps', lambda x: round(x, 2) if x else 'N/A'),
+                ('PE Ratio', 'trailingPE', lambda x: round(x, 2) if x else 'N/A')
+            ]
+            values = [formatter(info.get(key)) for _, key, formatter in metrics]
+            df = pd.DataFrame({'Value': values}, index=[label for label, _, _ in metrics])
+            df.index.name = 'Metric'
+            st.plotly_chart(plotly_table(df), use_container_width=True)
+        except Exception as e:
+            st.error(f"Error fetching key metrics: {e}")
 
+    with col2:
+        try:
+            df = pd.DataFrame(index=['Quick Ratio', 'Revenue/Share', 'Profit Margins', 'Debt to Equity', 'ROE'])
+            df['Value'] = [
+                info.get("quickRatio", 'N/A'),
+                info.get("revenuePerShare", 'N/A'),
+                info.get("profitMargins", 'N/A'),
+                info.get("debtToEquity", 'N/A'),
+                info.get("returnOnEquity", 'N/A')
+            ]
+            df.index.name = 'Metric'
+            st.plotly_chart(plotly_table(df), use_container_width=True)
+        except:
+            st.warning("Some financial ratios may not be available for this stock.")
 
-data = yf.download(ticker, start=start_date, end=end_date)
 
-try:
+def render_history_table(data):
     last_10_df = data.tail(10).sort_index(ascending=False).round(2)
     last_10_df = last_10_df.reset_index()
     last_10_df['Date'] = last_10_df['Date'].dt.strftime('%b %d, %Y')
     last_10_df.columns = [col if isinstance(col, str) else ' '.join(col).strip() for col in last_10_df.columns]
     st.plotly_chart(plotly_table(last_10_df), use_container_width=True)
-except Exception as e:
-    st.warning(f"❗ Unable to display historical table: {e}")
 
-# -------------------- Chart Period Selection --------------------
+
+@profiler.timed('render.charts')
+def render_charts(ticker, data_full, selected_period, chart_type, indicator):
+    if chart_type == 'Candle':
+        st.plotly_chart(candlestick(data_full, selected_period), use_container_width=True)
+        if indicator == 'RSI':
+            st.plotly_chart(RSI(data_full, selected_period, ticker), use_container_width=True)
+        elif indicator == 'MACD':
+            st.plotly_chart(MACD(data_full, selected_period, ticker), use_container_width=True)
+    else:
+        st.plotly_chart(close_chart(data_full, selected_period), use_container_width=True)
+        if indicator == 'RSI':
+            st.plotly_chart(RSI(data_full, selected_period, ticker), use_container_width=True)
+        elif indicator == 'MACD':
+            st.plotly_chart(MACD(data_full, selected_period, ticker), use_container_width=True)
+        elif indicator == 'Moving Average':
+            st.plotly_chart(Moving_average(data_full, selected_period, ticker), use_container_width=True)
+
+
+# --- Company Information Display ---
+st.markdown(f"<h3 class='section-title'>🏢 Company Overview: <span style='color:#1a3669'>{ticker}</span></h3>", unsafe_allow_html=True)
+overview_slot = st.container()
+
+# -------------------- Financial Metrics --------------------
+st.markdown("<h3 class='section-title'>📈 Financial Metrics</h3>", unsafe_allow_html=True)
+metrics_slot = st.container()
+
+# -------------------- Historical Table --------------------
+st.markdown("### Last 10 Days Performance")
+table_slot = st.container()
+
+# -------------------- Chart Explorer --------------------
 st.markdown("### Chart Explorer")
-col_btn = st.columns(6)
-period_options = ['5d', '1mo', '6mo', '1y', '5y', 'max']
-selected_period = st.session_state.get('period', '1y')
-
-for i, label in enumerate(['5D', '1M', '6M', '1Y', '5Y', 'MAX']):
-    if col_btn[i].button(label):
-        selected_period = period_options[i]
-        st.session_state['period'] = selected_period
-
-# -------------------- Chart Controls --------------------
-col_chart1, col_chart2 = st.columns(2)
-with col_chart1:
-    chart_type = st.selectbox("📈 Chart Type", ['Candle', 'Line'])
-with col_chart2:
-    indicator = st.selectbox("📉 Technical Indicator", ['RSI', 'MACD', 'Moving Average'] if chart_type == 'Line' else ['RSI', 'MACD'])
-
-# -------------------- Charts --------------------
-ticker_obj = yf.Ticker(ticker)
-data_full = ticker_obj.history(period="max")
-data_full = data_full.reset_index()
-
-if chart_type == 'Candle':
-    st.plotly_chart(candlestick(data_full, selected_period), use_container_width=True)
-    if indicator == 'RSI':
-        st.plotly_chart(RSI(data_full, selected_period), use_container_width=True)
-    elif indicator == 'MACD':
-        st.plotly_chart(MACD(data_full, selected_period), use_container_width=True)
-else:
-    st.plotly_chart(close_chart(data_full, selected_period), use_container_width=True)
-    if indicator == 'RSI':
-        st.plotly_chart(RSI(data_full, selected_period), use_container_width=True)
-    elif indicator == 'MACD':
-        st.plotly_chart(MACD(data_full, selected_period), use_container_width=True)
-    elif indicator == 'Moving Average':
-        st.plotly_chart(Moving_average(data_full, selected_period), use_container_width=True)
+chart_slot = st.container()
+
+
+# period buttons and chart controls only rerun this fragment, with the history it was given
+@st.fragment
+def chart_explorer(ticker, data_full):
+    col_btn = st.columns(6)
+    period_options = ['5d', '1mo', '6mo', '1y', '5y', 'max']
+    selected_period = st.session_state.get('period', '1y')
+
+    for i, label in enumerate(['5D', '1M', '6M', '1Y', '5Y', 'MAX']):
+        if col_btn[i].button(label):
+            selected_period = period_options[i]
+            st.session_state['period'] = selected_period
+
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        chart_type = st.selectbox("📈 Chart Type", ['Candle', 'Line'])
+    with col_chart2:
+        indicator = st.selectbox("📉 Technical Indicator", ['RSI', 'MACD', 'Moving Average'] if chart_type == 'Line' else ['RSI', 'MACD'])
+    render_charts(ticker, data_full, selected_period, chart_type, indicator)
+
+
+# -------------------- Sections, in the order their data arrives --------------------
+for name in loader.as_completed():
+    if name == 'info':
+        info = {}
+        with overview_slot:
+            try:
+                info = loader.result('info')
+                render_overview(info)
+            except Exception as e:
+                st.warning("⚠️ Unable to retrieve company information. Please try a different ticker.")
+        with metrics_slot:
+            render_metrics(info)
+    elif name == 'history':
+        with table_slot:
+            try:
+                render_history_table(prices_between(loader.result('history'), start_date, end_date))
+            except Exception as e:
+                st.warning(f"❗ Unable to display historical table: {e}")
+        with chart_slot:
+            chart_explorer(ticker, loader.result('history'))
+
+profiler.render_panel(profile_run)
@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 from pages.utils.model_train import (
-    get_data, get_rolling_mean, get_differencing_order,
-    scaling, evaluate_model, get_forecast, inverse_scaling
+    get_data, get_rolling_mean, monte_carlo_forecast, evaluate_monte_carlo, MC_PATHS
 )
-from pages.utils.plotly_figure import plotly_table, Moving_average_forecast
+from pages.utils.forecast_cache import cached_forecast
+from pages.utils.plotly_figure import plotly_table, Moving_average_forecast, backtest_chart
+from pages.utils.backtest import backtest_series
+from pages.utils import profiler
 
 # Streamlit config
 st.set_page_config(
@@ -12,6 +14,7 @@ st.set_page_config(
     page_icon="🔮",
     layout="wide"
 )
+profile_run = profiler.start_run("Price Forecast")
 
 st.markdown("""
     <style>
@@ -82,12 +85,16 @@ st.title("🔮 Price Forecast")
 
 # Stock Ticker Selection (Dropdown + Manual Entry)
 famous_tickers = ['TSLA', 'AAPL', 'GOOGL', 'MSFT', 'AMZN', 'META', 'NFLX', 'NVDA', 'IBM']
-col1, col2 = st.columns([2, 2])
+# Monte Carlo tiers simulate paths in milliseconds; ARIMA is the full model
+forecast_models = {'ARIMA': None, 'Monte Carlo (GBM)': 'gbm', 'Monte Carlo (block bootstrap)': 'bootstrap'}
+col1, col2, col3 = st.columns([2, 2, 2])
 
 with col1:
     ticker_dropdown = st.selectbox("Choose from Popular Tickers", famous_tickers)
 with col2:
     custom_ticker = st.text_input("Or enter a custom ticker", "")
+with col3:
+    model_choice = st.selectbox("Forecast Model", list(forecast_models))
 
 # Final ticker to use
 ticker = custom_ticker.strip().upper() if custom_ticker else ticker_dropdown
@@ -99,24 +106,40 @@ rolling_price = get_rolling_mean(close_price)
 st.markdown(f"### 📅 30-Day Smart Forecast for {ticker}")
 
 try:
-    differencing_order = get_differencing_order(rolling_price)
-    scaled_data, scaler = scaling(rolling_price)
-
-    rmse = evaluate_model(scaled_data, differencing_order)
-
-    forecast = get_forecast(scaled_data, differencing_order)
-    forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
-
-    # 📊 Relative RMSE
-    mean_price = float(close_price['Close'].iloc[-30:].mean())
-    rel_rmse = (rmse / mean_price) * 100
+    method = forecast_models[model_choice]
+    if method is None:
+        # stored per ticker, bars and model config; only the first view of new bars runs the models
+        result = cached_forecast(ticker, close_price)
+        forecast = result['forecast']
+        rmse, rel_rmse, mean_price = result['rmse'], result['rel_rmse'], result['mean_price']
+    else:
+        forecast = monte_carlo_forecast(rolling_price, method=method)
+        rmse = evaluate_monte_carlo(rolling_price, method=method)
+        mean_price = float(close_price['Close'].iloc[-30:].mean())
+        rel_rmse = (rmse / mean_price) * 100
 
     st.success(f"📊 RMSE Score: **{rmse}**")
     st.info(f"📉 Relative RMSE: **{rel_rmse:.2f}%** of avg. price (${mean_price:.2f})")
+    if method is None:
+        selection = result['selection']
+        if result['cached']:
+            search_note = f"forecast cached at {result['computed_at'].replace('T', ' ')}"
+        elif result['model_update'] != 'full_fit':
+            search_note = f"stored model {result['model_update'].replace('_', ' ')}"
+        elif selection['cached']:
+            search_note = 'order cached'
+        else:
+            search_note = f"{selection['search_seconds']:.1f}s search"
+        st.caption(f"Model: ARIMA{result['order']} chosen by {selection['criterion'].upper()} "
+                   f"({selection['n_fitted']} candidates fitted, {selection['n_skipped']} skipped, {search_note})")
+    else:
+        st.caption(f"Model: {model_choice}, median of {MC_PATHS:,} simulated paths with percentile bands "
+                   f"(RMSE of the median path over the last 30 days)")
 
     st.markdown("#### 🌐 Predictive Outlook")
     forecast_rounded = forecast.round(2)
-    st.plotly_chart(plotly_table(forecast_rounded), use_container_width=True)
+    with profiler.span('render.forecast_table'):
+        st.plotly_chart(plotly_table(forecast_rounded), use_container_width=True)
 
     # ✅ Combine historical and forecast data for full visualization
     historical_df = rolling_price.copy()
@@ -125,7 +148,25 @@ try:
 
     display_start = max(0, len(combined_df) - 180)
     st.markdown("#### 🔍 Future Insights")
-    st.plotly_chart(Moving_average_forecast(combined_df.iloc[display_start:]), use_container_width=True)
+    with profiler.span('render.forecast_chart'):
+        st.plotly_chart(Moving_average_forecast(combined_df.iloc[display_start:]), use_container_width=True)
+
+    # 🧪 Walk-forward backtest: one fit, then a forecast from each of the last origins
+    st.markdown("#### 🧪 Walk-Forward Backtest")
+    if method is not None:
+        st.caption("The walk-forward backtest evaluates the ARIMA model.")
+    elif st.toggle("Evaluate the model over the last 10 forecast origins"):
+        # order and scaler come from the bars before the first origin, not from the forecast above
+        evaluation = backtest_series(rolling_price, ticker=ticker)
+        col1, col2 = st.columns(2)
+        col1.metric("RMSE (all horizons)", f"${evaluation['rmse']:.2f}")
+        col2.metric("MAPE (all horizons)", f"{evaluation['mape']:.2f}%")
+        st.plotly_chart(backtest_chart(evaluation['by_horizon']), use_container_width=True)
+        st.caption(f"ARIMA{evaluation['order']} chosen on the bars before the first origin, "
+                   f"{len(evaluation['origins'])} origins, {evaluation['n_fits']} model fit(s), "
+                   f"{evaluation['seconds']:.2f}s")
 
 except Exception as e:
-    st.error(f"❌ Forecasting failed: {e}")
\ No newline at end of file
+    st.error(f"❌ Forecasting failed: {e}")
+
+profiler.render_panel(profile_run)
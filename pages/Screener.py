@@ -0,0 +1,78 @@
+import streamlit as st
+from pages.utils.screener import screen_universe, OVERSOLD, OVERBOUGHT, BULLISH, BEARISH, COLUMNS
+from pages.utils import profiler
+
+# ---------------- Page Config ----------------
+st.set_page_config(page_title="Screener", page_icon="🔬", layout="wide")
+profile_run = profiler.start_run("Screener")
+
+# ---------------- Page Styling ----------------
+st.markdown("""
+    <style>
+        html, body, [class*="css"] {
+            font-family: 'Poppins', sans-serif;
+            background-color: #f4f7fa;
+        }
+        .stSidebar {
+            background-color: #b2d8c2 !important;
+            background-image: linear-gradient(to bottom, #b2d8c2, #9acaa6);
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+st.title("🔬 Screener")
+st.markdown("Screen a whole universe on RSI, MACD and the 50-day SMA at its latest bar.")
+
+# ---------------- Universe ----------------
+popular_tickers = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOGL', 'META', 'TSLA', 'NFLX', 'BRK-B', 'JPM',
+                   'V', 'UNH', 'XOM', 'JNJ', 'WMT', 'PG', 'MA', 'HD', 'COST', 'AVGO']
+
+universe_text = st.text_area("🌐 Tickers to screen (comma, space or newline separated)",
+                             ", ".join(popular_tickers), height=120)
+watchlist = st.file_uploader("📄 Or upload a watchlist (one ticker per line)", type=['txt', 'csv'])
+universe = universe_text.replace(',', ' ').split()
+if watchlist is not None:
+    universe += watchlist.getvalue().decode().replace(',', ' ').split()
+
+# ---------------- Filters ----------------
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    rsi_range = st.slider("📉 RSI range", 0, 100, (0, 100))
+with col2:
+    macd_cross = st.selectbox("✂️ MACD cross today", ["Any", BULLISH, BEARISH])
+with col3:
+    sma_filter = st.selectbox("📈 Close vs 50-day SMA", ["Any", "Above", "Below"])
+with col4:
+    sort_by = st.selectbox("↕️ Sort by", ['RSI', 'Change %', 'vs SMA_50 %', 'Histogram', 'Ticker'])
+    ascending = st.toggle("Ascending", value=True)
+
+filters = {
+    'rsi_min': rsi_range[0] if rsi_range[0] > 0 else None,
+    'rsi_max': rsi_range[1] if rsi_range[1] < 100 else None,
+    'macd_cross': None if macd_cross == "Any" else macd_cross,
+    'above_sma': None if sma_filter == "Any" else sma_filter == "Above",
+    'sort_by': sort_by,
+    'ascending': ascending,
+}
+
+# ---------------- Results ----------------
+try:
+    matches, screened = screen_universe(universe, **filters)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🌐 Tickers Screened", screened)
+    col2.metric("✅ Matches", len(matches))
+    col3.metric(f"🟢 Oversold (RSI < {OVERSOLD})", int((matches['RSI'] < OVERSOLD).sum()))
+    col4.metric(f"🔴 Overbought (RSI > {OVERBOUGHT})", int((matches['RSI'] > OVERBOUGHT).sum()))
+
+    if matches.empty:
+        st.info("No ticker in the universe matches these filters today.")
+    else:
+        table = matches[COLUMNS].copy()
+        table['Date'] = table['Date'].dt.strftime('%Y-%m-%d')
+        st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Download matches (CSV)", table.to_csv(index=False), "screener.csv", "text/csv")
+except Exception as e:
+    st.error(f"❌ Error: {e}")
+
+profiler.render_panel(profile_run)
@@ -1,12 +1,18 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import datetime
+from dateutil.relativedelta import relativedelta
 import plotly.graph_objects as go
+from pages.utils.data_store import load_prices
+from pages.utils.anomaly import zscore_frame, scan_universe, SPIKE, DIP
+from pages.utils.providers import get_provider
+from pages.utils.streaming import StreamingZScore
+from pages.utils import profiler
 
 # ---------------- Page Config ----------------
 st.set_page_config(page_title="Trade Alert", page_icon="🚨", layout="wide")
+profile_run = profiler.start_run("Trade Alert")
 
 # ---------------- Page Styling ----------------
 st.markdown("""
@@ -31,8 +37,111 @@ popular_tickers = {
     "Amazon (AMZN)": "AMZN", "Google (GOOGL)": "GOOGL", "Meta (META)": "META", "NVIDIA (NVDA)": "NVDA"
 }
 
-col1, col2 = st.columns(2)
 today = datetime.date.today()
+mode = st.radio("🔭 Mode", ["Single Stock", "Universe Scanner", "Intraday Stream"], horizontal=True)
+
+# ---------------- Universe Scanner ----------------
+if mode == "Universe Scanner":
+    universe_text = st.text_area("🌐 Tickers to scan (comma, space or newline separated)",
+                                 ", ".join(popular_tickers.values()), height=120)
+    col1, col2 = st.columns(2)
+    with col1:
+        scan_start = st.date_input("📅 Start Date", today - relativedelta(years=1))
+    with col2:
+        scan_end = st.date_input("📅 End Date", today)
+    universe = universe_text.replace(',', ' ').split()
+
+    try:
+        current, scanned = scan_universe(universe, start=scan_start, end=scan_end)
+
+        st.markdown("### 🔎 Current Anomalies")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📈 Spikes", int((current['Anomaly'] == SPIKE).sum()))
+        col2.metric(" 📉 Dips", int((current['Anomaly'] == DIP).sum()))
+        col3.metric("🌐 Tickers Scanned", scanned)
+
+        if current.empty:
+            st.success("✅ No ticker in the universe is currently outside its Z-score band.")
+        else:
+            table = current.copy()
+            table['Date'] = table['Date'].dt.strftime('%Y-%m-%d')
+            st.dataframe(table.rename(columns={'Close': 'Close Price', 'RollingMean': '20D Mean', 'Zscore': 'Z-Score'})
+                         .round(2), use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
+    profiler.render_panel(profile_run)
+    st.stop()
+
+# ---------------- Intraday Stream ----------------
+if mode == "Intraday Stream":
+    ticker_dropdown = st.selectbox("📂 Choose Stock", list(popular_tickers.keys()))
+    custom_ticker = st.text_input(" Or enter custom ticker", "")
+    ticker = custom_ticker.strip().upper() if custom_ticker else popular_tickers[ticker_dropdown]
+
+    try:
+        bars = get_provider().history(ticker, period='1d', interval='1m')['Close'].dropna()
+
+        # replay the session bar by bar through the same O(1) detector a live feed would use
+        detector = StreamingZScore()
+        zscores = [detector.update(ticker, price, ts) for ts, price in bars.items()]
+
+        st.markdown(f"### ⏱️ 1-Minute Z-Score for {ticker}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("📈 Spikes", sum(e['anomaly'] == SPIKE for e in detector.events))
+        col2.metric(" 📉 Dips", sum(e['anomaly'] == DIP for e in detector.events))
+        col3.metric("🕒 Bars Streamed", len(bars))
+
+        i_fig = go.Figure()
+        i_fig.add_trace(go.Scatter(x=bars.index, y=zscores, mode='lines', name='Z-Score', line=dict(color='orange')))
+        i_fig.add_hline(y=2, line=dict(color='limegreen', dash='dash'), annotation_text='Spike Threshold')
+        i_fig.add_hline(y=-2, line=dict(color='red', dash='dash'), annotation_text='Dip Threshold')
+        i_fig.update_layout(
+            plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
+            font=dict(color='white'), height=400,
+            xaxis=dict(gridcolor='#444'), yaxis=dict(gridcolor='#444')
+        )
+        st.plotly_chart(i_fig, use_container_width=True)
+
+        with st.expander("📄 View Intraday Events"):
+            events = pd.DataFrame(list(detector.events), columns=['timestamp', 'price', 'mean', 'zscore', 'anomaly'])
+            st.dataframe(events.rename(columns={'timestamp': 'Time', 'price': 'Price', 'mean': '20-Bar Mean',
+                                                'zscore': 'Z-Score', 'anomaly': 'Anomaly'}).round(2),
+                         use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
+    profiler.render_panel(profile_run)
+    st.stop()
+
+# ---------------- Expanders ----------------
+# each reruns on its own controls only, without reloading prices or recomputing the z-scores
+@st.fragment
+def anomalies_table(anomalies):
+    with st.expander("📄 View Anomalies Table"):
+        show = st.radio("Show", ["All", SPIKE, DIP], horizontal=True)
+        table = anomalies if show == "All" else anomalies[anomalies['Anomaly'] == show]
+        table = table.copy()
+        table.index = table.index.strftime('%Y-%m-%d')
+        st.dataframe(table[['Close', 'Zscore', 'Anomaly']].rename(
+            columns={'Close': 'Close Price', 'Zscore': 'Z-Score'}).round(2), use_container_width=True)
+
+
+@st.fragment
+def anomaly_timeline(df):
+    with st.expander("🕒 View Timeline of Anomalies"):
+        emoji = df['Anomaly'].map({'📈 Spike': '📈', '📉 Dip': '📉', 'Normal': '⚪'})
+        t_fig = go.Figure()
+        t_fig.add_trace(go.Scatter(
+            x=df.index, y=[0]*len(df), mode='text', text=emoji,
+            textfont=dict(size=16), hovertext=df['Anomaly'], hoverinfo='text'
+        ))
+        t_fig.update_layout(
+            height=100, yaxis=dict(visible=False), xaxis=dict(showgrid=False),
+            plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=20, b=30)
+        )
+        st.plotly_chart(t_fig, use_container_width=True)
+
+
+col1, col2 = st.columns(2)
 
 with col1:
     ticker_dropdown = st.selectbox("📂 Choose Stock", list(popular_tickers.keys()))
@@ -40,19 +149,15 @@ with col1:
     ticker = custom_ticker.strip().upper() if custom_ticker else popular_tickers[ticker_dropdown]
 
 with col2:
-    start_date = st.date_input("📅 Start Date", datetime.date(today.year - 1, today.month, today.day))
+    start_date = st.date_input("📅 Start Date", today - relativedelta(years=1))
     end_date = st.date_input("📅 End Date", today)
 
 # ---------------- Data & Analysis ----------------
 try:
-    df = yf.download(ticker, start=start_date, end=end_date)[['Close']].dropna()
-
-    df['RollingMean'] = df['Close'].rolling(20).mean()
-    df['RollingStd'] = df['Close'].rolling(20).std()
-    df.dropna(inplace=True)
+    close = load_prices(ticker, start=start_date, end=end_date)[['Close']].dropna()
 
-    df['Zscore'] = ((df['Close'].squeeze() - df['RollingMean'].squeeze()) / df['RollingStd'].squeeze())
-    df['Anomaly'] = df['Zscore'].apply(lambda x: '📈 Spike' if x > 2 else ('📉 Dip' if x < -2 else 'Normal'))
+    # 20-day rolling z-score, labelled with a vectorized select
+    df = zscore_frame(close)
     anomalies = df[df['Anomaly'] != 'Normal']
 
     # ---------------- Summary Stats ----------------
@@ -107,24 +212,10 @@ try:
         st.success("✅ No significant spikes or dips detected during the selected time period.")
 
     # ---------------- Expanders ----------------
-    with st.expander("📄 View Anomalies Table"):
-        table = anomalies.copy()
-        table.index = table.index.strftime('%Y-%m-%d')
-        st.dataframe(table[['Close', 'Zscore', 'Anomaly']].rename(
-            columns={'Close': 'Close Price', 'Zscore': 'Z-Score'}).round(2), use_container_width=True)
-
-    with st.expander("🕒 View Timeline of Anomalies"):
-        emoji = df['Anomaly'].map({'📈 Spike': '📈', '📉 Dip': '📉', 'Normal': '⚪'})
-        t_fig = go.Figure()
-        t_fig.add_trace(go.Scatter(
-            x=df.index, y=[0]*len(df), mode='text', text=emoji,
-            textfont=dict(size=16), hovertext=df['Anomaly'], hoverinfo='text'
-        ))
-        t_fig.update_layout(
-            height=100, yaxis=dict(visible=False), xaxis=dict(showgrid=False),
-            plot_bgcolor='white', paper_bgcolor='white', margin=dict(t=20, b=30)
-        )
-        st.plotly_chart(t_fig, use_container_width=True)
+    anomalies_table(anomalies)
+    anomaly_timeline(df)
 
 except Exception as e:
     st.error(f"❌ Error: {e}")
+
+profiler.render_panel(profile_run)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from pages.utils.data_store import load_close_matrix
+from pages.utils.profiler import timed
+
+# Rolling z-score anomaly detection on a dates x tickers matrix. Every column is
+# processed at once, as strided views of the windows (no copy of the matrix per
+# window), with the same results as pandas rolling(window).mean()/.std().
+WINDOW = 20
+THRESHOLD = 2
+SPIKE = '📈 Spike'
+DIP = '📉 Dip'
+NORMAL = 'Normal'
+
+
+def rolling_zscore(values, window=WINDOW):
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        # every window is reduced on its own values: sums carried over the whole history cancel
+        # catastrophically once prices have trended far from where they started
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        mean[window - 1:] = windows.mean(axis=-1)
+        std[window - 1:] = windows.std(axis=-1, ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        zscore = (values - mean) / std
+    return mean, std, zscore
+
+
+def label_anomalies(zscore, threshold=THRESHOLD):
+    zscore = np.asarray(zscore)
+    return np.select([zscore > threshold, zscore < -threshold], [SPIKE, DIP], NORMAL)
+
+
+@timed()
+def zscore_frame(close, window=WINDOW, threshold=THRESHOLD):
+    close = close.squeeze('columns') if isinstance(close, pd.DataFrame) else close
+    mean, std, zscore = rolling_zscore(close.values, window)
+    df = pd.DataFrame({
+        'Close': close.values,
+        'RollingMean': mean[:, 0],
+        'RollingStd': std[:, 0],
+        'Zscore': zscore[:, 0],
+    }, index=close.index)
+    df = df.dropna()
+    df['Anomaly'] = label_anomalies(df['Zscore'].values, threshold)
+    return df
+
+
+def scan_closes(closes, window=WINDOW, threshold=THRESHOLD):
+    # closes: DataFrame indexed by date with one column per ticker
+    values = closes.values.astype('float64')
+    mean, std, zscore = rolling_zscore(values, window)
+
+    # the latest bar of each ticker (names can stop trading before the last date)
+    has_value = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(has_value[::-1], axis=0)
+    cols = np.arange(values.shape[1])
+    latest_z = zscore[last, cols]
+
+    result = pd.DataFrame({
+        'Ticker': closes.columns,
+        'Date': closes.index[last],
+        'Close': values[last, cols],
+        'RollingMean': mean[last, cols],
+        'Zscore': latest_z,
+        'Anomaly': label_anomalies(latest_z, threshold),
+    })
+    result = result[has_value.any(axis=0) & (result['Anomaly'] != NORMAL)]
+    order = np.argsort(-np.abs(result['Zscore'].values), kind='stable')
+    return result.iloc[order].reset_index(drop=True)
+
+
+@timed()
+def scan_universe(tickers, start=None, end=None, window=WINDOW, threshold=THRESHOLD):
+    closes = load_close_matrix(tickers, start=start, end=end)
+    return scan_closes(closes, window, threshold), closes.shape[1]
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from pages.utils.model_train import get_data, get_rolling_mean, get_differencing_order, scaling
+from pages.utils.order_search import select_order
+from pages.utils.batch_forecast import write_results, read_watchlist
+from pages.utils.profiler import timed
+
+# Rolling-origin (walk-forward) evaluation of the forecaster.
+# The model is fitted once, on the data before the first origin. Its
+# parameters are then run through the Kalman filter over the whole series
+# (one filtering pass, no optimisation), and the forecast from every origin is
+# a dynamic prediction from that filtered state, which only uses observations
+# before the origin. With refit_every=k, the parameters are re-estimated every
+# k origins on the data available at that origin, warm-started from the
+# previous parameters, so drift is tracked at a fraction of the cost of a
+# cold fit. Errors are reported per horizon (1..horizon steps ahead) in price units.
+N_ORIGINS = 10
+HORIZON = 30
+STEP = 5
+REFIT_MAXITER = 25
+
+
+def _origins(n_obs, n_origins, horizon, step, min_train):
+    last = n_obs - horizon
+    origins = [last - i * step for i in range(n_origins)][::-1]
+    origins = [o for o in origins if o >= min_train]
+    if not origins:
+        raise ValueError(f"Series too short for a backtest: {n_obs} observations, horizon {horizon}")
+    return origins
+
+
+def _fit(train, order, start_params=None, maxiter=None):
+    from statsmodels.tsa.arima.model import ARIMA
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        kwargs = {'method_kwargs': {'maxiter': maxiter}} if maxiter else {}
+        return ARIMA(train, order=order).fit(start_params=start_params, **kwargs).params
+
+
+def _filter(data, order, params):
+    from statsmodels.tsa.arima.model import ARIMA
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return ARIMA(data, order=order).filter(params)
+
+
+@timed()
+def backtest(data, order, scaler=None, n_origins=N_ORIGINS, horizon=HORIZON, step=STEP, refit_every=None,
+             min_train=None):
+    # data: the (scaled) series the forecaster is fitted on; scaler maps it back to prices
+    started = time.perf_counter()
+    data = np.asarray(data, dtype='float64').ravel()
+    order = tuple(order)
+    min_train = min_train or max(60, 2 * sum(order))
+    origins = _origins(len(data), n_origins, horizon, step, min_train)
+
+    params = _fit(data[:origins[0]], order)
+    filtered = _filter(data, order, params)
+    n_fits = 1
+
+    def to_price(values):
+        values = np.asarray(values).reshape(-1, 1)
+        return (scaler.inverse_transform(values) if scaler is not None else values).ravel()
+
+    rows = []
+    for i, origin in enumerate(origins):
+        if refit_every and i and i % refit_every == 0:
+            params = _fit(data[:origin], order, start_params=params, maxiter=REFIT_MAXITER)
+            filtered = _filter(data, order, params)
+            n_fits += 1
+        predicted = filtered.get_prediction(start=origin, end=origin + horizon - 1, dynamic=True).predicted_mean
+        actual = to_price(data[origin:origin + horizon])
+        predicted = to_price(predicted)
+        for h in range(horizon):
+            rows.append((origin, h + 1, actual[h], predicted[h]))
+
+    errors = pd.DataFrame(rows, columns=['origin', 'horizon', 'actual', 'forecast'])
+    errors['error'] = errors['forecast'] - errors['actual']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        errors['ape'] = np.abs(errors['error'] / errors['actual']) * 100
+    grouped = errors.groupby('horizon')
+    by_horizon = pd.DataFrame({
+        'RMSE': np.sqrt(grouped['error'].apply(lambda e: np.mean(e ** 2))),
+        'MAPE': grouped['ape'].mean(),
+        'n': grouped.size(),
+    })
+    return {
+        'order': order,
+        'origins': origins,
+        'by_horizon': by_horizon,
+        'errors': errors,
+        'rmse': float(np.sqrt(np.mean(errors['error'] ** 2))),
+        'mape': float(errors['ape'].mean()),
+        'n_fits': n_fits,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def backtest_series(rolling_price, order='auto', ticker=None, n_origins=N_ORIGINS, horizon=HORIZON, step=STEP,
+                    refit_every=None, max_workers=1):
+    # the scaler, the differencing order and the order search only see the data before the first origin,
+    # so the backtest does not see the future
+    values = np.asarray(rolling_price, dtype='float64').ravel()
+    first = _origins(len(values), n_origins, horizon, step, 0)[0]
+    _, scaler = scaling(values[:first])
+    scaled_data = scaler.transform(values.reshape(-1, 1))
+    if order == 'auto':
+        differencing_order = get_differencing_order(values[:first], ticker=ticker)
+        order = select_order(scaled_data[:first], differencing_order, ticker=ticker,
+                             max_workers=max_workers)['order']
+    return backtest(scaled_data, order, scaler, n_origins, horizon, step, refit_every)
+
+
+def backtest_ticker(ticker, order='auto', n_origins=N_ORIGINS, horizon=HORIZON, step=STEP, refit_every=None,
+                    max_workers=1):
+    close_price = get_data(ticker)
+    if close_price.empty:
+        raise ValueError("no price data")
+    result = backtest_series(get_rolling_mean(close_price), order, ticker, n_origins, horizon, step, refit_every,
+                             max_workers)
+    result['ticker'] = ticker
+    return result
+
+
+def _backtest_worker(ticker, order, n_origins, horizon, step, refit_every):
+    try:
+        return backtest_ticker(ticker, order, n_origins, horizon, step, refit_every)
+    except Exception as e:
+        return {'ticker': ticker, 'error': f"{type(e).__name__}: {e}"}
+
+
+def backtest_tickers(tickers, workers=None, order='auto', n_origins=N_ORIGINS, horizon=HORIZON, step=STEP,
+                     refit_every=None):
+    # tickers are independent, one worker process each; returns per-horizon errors (long format) and failures
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(tickers))) as executor:
+        futures = {executor.submit(_backtest_worker, t, order, n_origins, horizon, step, refit_every): t
+                   for t in tickers}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    frames, failures = [], {}
+    for ticker in tickers:
+        result = results[ticker]
+        if 'error' in result:
+            failures[ticker] = result['error']
+            continue
+        frame = result['by_horizon'].reset_index()
+        frame.insert(0, 'ticker', ticker)
+        frame['order'] = str(result['order'])
+        frame['n_fits'] = result['n_fits']
+        frames.append(frame)
+    columns = ['ticker', 'horizon', 'RMSE', 'MAPE', 'n', 'order', 'n_fits']
+    summary = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    return summary, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecaster.")
+    parser.add_argument('tickers', nargs='*', help="ticker symbols")
+    parser.add_argument('--watchlist', help="file with one ticker per line")
+    parser.add_argument('--origins', type=int, default=N_ORIGINS, help="number of forecast origins")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="forecast steps per origin")
+    parser.add_argument('--step', type=int, default=STEP, help="bars between origins")
+    parser.add_argument('--refit-every', type=int, default=None, help="warm-started refit every N origins")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--output', default=None, help="write the per-horizon table (.parquet or .csv)")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers + (read_watchlist(args.watchlist) if args.watchlist else [])
+    if not tickers:
+        parser.error("no tickers given")
+    started = time.perf_counter()
+    summary, failures = backtest_tickers(tickers, args.workers, n_origins=args.origins, horizon=args.horizon,
+                                         step=args.step, refit_every=args.refit_every)
+    for ticker, error in failures.items():
+        print(f"{ticker}: {error}")
+    if not summary.empty:
+        overall = summary.groupby('horizon')[['RMSE', 'MAPE']].mean()
+        print(overall.iloc[[0, len(overall) // 2, -1]].round(3).to_string())
+    if args.output:
+        write_results(summary, args.output)
+        print(f"results written to {args.output}")
+    print(f"{len(tickers) - len(failures)}/{len(tickers)} tickers in {time.perf_counter() - started:.2f}s")
+    return 0 if not failures else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
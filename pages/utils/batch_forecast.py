@@ -0,0 +1,185 @@
+import os
+import sys
+import math
+import time
+import signal
+import argparse
+import warnings
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from pages.utils.model_train import (
+    get_data, get_rolling_mean, get_differencing_order,
+    scaling, fit_model, inverse_scaling, forecast_frame
+)
+from pages.utils.order_search import select_order
+
+# Nightly watchlist forecasting. Tickers fan out over a process pool; each one
+# runs under its own timeout and a failure only marks that ticker as failed.
+# All forecasts land in one long-format table (one row per ticker and day).
+DEFAULT_TIMEOUT = 300
+
+
+class TickerTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise TickerTimeout()
+
+
+def forecast_ticker(ticker, order='auto'):
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        close_price = get_data(ticker)
+        if close_price.empty:
+            raise ValueError("no price data")
+        rolling_price = get_rolling_mean(close_price)
+        differencing_order = get_differencing_order(rolling_price, ticker=ticker)
+        scaled_data, scaler = scaling(rolling_price)
+        if order == 'auto':
+            # already running inside a pool worker, so the search itself stays serial
+            order = select_order(scaled_data, differencing_order, ticker=ticker, max_workers=1)['order']
+        predictions = fit_model(scaled_data, differencing_order, order=order)
+
+    forecast = forecast_frame(predictions)
+    forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
+    return {
+        'ticker': ticker,
+        'status': 'ok',
+        'order': str(tuple(order) if order else (30, differencing_order, 30)),
+        'last_close': float(close_price['Close'].iloc[-1].squeeze()),
+        'forecast': forecast,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_with_timeout(ticker, timeout, fn, *args):
+    # fn(*args) under a per-ticker alarm (where the platform has SIGALRM); a timeout or an
+    # exception becomes a failed result for the ticker instead of propagating
+    started = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.alarm(int(math.ceil(timeout)))
+    try:
+        result = fn(*args)
+    except TickerTimeout:
+        result = {'ticker': ticker, 'status': 'timeout', 'error': f"exceeded {timeout}s"}
+    except Exception as e:
+        result = {'ticker': ticker, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _forecast_worker(ticker, order, timeout):
+    return run_with_timeout(ticker, timeout, forecast_ticker, ticker, order)
+
+
+def forecast_rows(result, run_at):
+    # one row per forecast day, or a single row without a forecast for a failed ticker;
+    # callers pick the columns they report
+    base = {
+        'run_at': run_at, 'ticker': result['ticker'], 'status': result['status'],
+        'order': result.get('order'), 'rmse': result.get('rmse'), 'last_close': result.get('last_close'),
+        'error': result.get('error'), 'seconds': round(result['seconds'], 3),
+    }
+    if result['status'] != 'ok' or result.get('forecast') is None:
+        return [dict(base, date=pd.NaT, forecast_close=float('nan'))]
+    forecast = result['forecast']['Close']
+    return [dict(base, date=date, forecast_close=float(value)) for date, value in forecast.items()]
+
+
+def write_results(frame, output):
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    if output.endswith('.csv'):
+        frame.to_csv(output, index=False)
+    else:
+        frame.to_parquet(output, index=False)
+
+
+def run_batch(tickers, workers=None, timeout=DEFAULT_TIMEOUT, order='auto', output=None, retries=1):
+    started = time.perf_counter()
+    run_at = datetime.now()
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    workers = workers or os.cpu_count() or 1
+
+    results = {}
+    pending = list(tickers)
+    attempt = 0
+    while pending:
+        crashed = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {executor.submit(_forecast_worker, t, order, timeout): t for t in pending}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except BrokenProcessPool:
+                    # a worker died hard (segfault, OOM kill); every unfinished ticker lands here
+                    crashed.append(ticker)
+        attempt += 1
+        if attempt > retries:
+            for ticker in crashed:
+                results[ticker] = {'ticker': ticker, 'status': 'error', 'error': 'worker process crashed',
+                                   'seconds': 0.0}
+            crashed = []
+        pending = crashed
+
+    rows = [row for t in tickers for row in forecast_rows(results[t], run_at)]
+    frame = pd.DataFrame(rows, columns=['run_at', 'ticker', 'date', 'forecast_close', 'status',
+                                        'order', 'last_close', 'error', 'seconds'])
+    if output:
+        write_results(frame, output)
+
+    elapsed = time.perf_counter() - started
+    statuses = [r['status'] for r in results.values()]
+    ok = statuses.count('ok')
+    stats = {
+        'tickers': len(tickers),
+        'ok': ok,
+        'errors': statuses.count('error'),
+        'timeouts': statuses.count('timeout'),
+        'workers': workers,
+        'seconds': round(elapsed, 2),
+        # throughput counts forecasts delivered; failed and timed-out tickers are in the attempted rate
+        'tickers_per_minute': round(ok / elapsed * 60, 2) if elapsed else float('inf'),
+        'attempted_per_minute': round(len(tickers) / elapsed * 60, 2) if elapsed else float('inf'),
+    }
+    return frame, stats
+
+
+def read_watchlist(path):
+    with open(path) as f:
+        return [line.split('#')[0].strip() for line in f if line.split('#')[0].strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast a watchlist of tickers in parallel.")
+    parser.add_argument('tickers', nargs='*', help="ticker symbols")
+    parser.add_argument('--watchlist', help="file with one ticker per line")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="seconds allowed per ticker")
+    parser.add_argument('--output', default=os.path.join('.equinova', 'forecasts', f"{datetime.now():%Y-%m-%d}.parquet"),
+                        help="output file (.parquet or .csv)")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers + (read_watchlist(args.watchlist) if args.watchlist else [])
+    if not tickers:
+        parser.error("no tickers given")
+    _, stats = run_batch(tickers, workers=args.workers, timeout=args.timeout, output=args.output)
+    print(f"{stats['ok']}/{stats['tickers']} tickers forecast ({stats['errors']} errors, {stats['timeouts']} timeouts) "
+          f"in {stats['seconds']}s with {stats['workers']} workers: {stats['tickers_per_minute']} tickers/min "
+          f"forecast ({stats['attempted_per_minute']} attempted)")
+    print(f"results written to {args.output}")
+    return 0 if stats['ok'] == stats['tickers'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
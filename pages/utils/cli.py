@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import argparse
+import warnings
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from pages.utils.data_store import load_prices, load_close_matrix
+from pages.utils.model_train import (
+    get_rolling_mean, get_differencing_order, scaling, inverse_scaling, ForecastPipeline
+)
+from pages.utils.order_search import select_order
+from pages.utils.anomaly import zscore_frame, NORMAL
+from pages.utils.batch_forecast import (
+    DEFAULT_TIMEOUT, run_with_timeout, forecast_rows, write_results, read_watchlist
+)
+
+# Headless forecasts and z-score alerts for a list of tickers, for cron jobs:
+#   python -m pages.utils.cli AAPL MSFT --start 2024-01-01 --workers 4 --output-dir out/
+# Writes forecasts.<format> (one row per ticker and forecast day) and
+# alerts.<format> (one row per anomalous bar), then prints per-stage timings.
+# Nothing here imports Streamlit or Plotly.
+DEFAULT_START = '2024-01-01'
+STAGES = ['fetch', 'differencing', 'order_search', 'fit', 'forecast', 'zscore']
+
+
+def process_ticker(ticker, start=DEFAULT_START, end=None, run_forecast=True, run_alerts=True):
+    timings = {}
+    result = {'ticker': ticker, 'status': 'ok', 'timings': timings, 'forecast': None, 'alerts': None}
+
+    def stage(name, fn):
+        started = time.perf_counter()
+        value = fn()
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+        return value
+
+    close = stage('fetch', lambda: load_prices(ticker, start=start, end=end)[['Close']].dropna())
+    if close.empty:
+        raise ValueError("no price data")
+    result['last_close'] = float(close['Close'].iloc[-1])
+
+    if run_alerts:
+        alerts = stage('zscore', lambda: zscore_frame(close))
+        result['alerts'] = alerts[alerts['Anomaly'] != NORMAL]
+
+    if run_forecast:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            rolling_price = get_rolling_mean(close)
+            differencing_order = stage('differencing', lambda: get_differencing_order(rolling_price, ticker=ticker))
+            scaled_data, scaler = scaling(rolling_price)
+            # already running inside a pool worker, so the search itself stays serial
+            selection = stage('order_search', lambda: select_order(scaled_data[:-30], differencing_order,
+                                                                   ticker=ticker, max_workers=1))
+            pipeline = stage('fit', lambda: ForecastPipeline(scaled_data, differencing_order,
+                                                             order=selection['order']).fit())
+        rmse = stage('forecast', lambda: pipeline.evaluate(scaler))
+        forecast = stage('forecast', pipeline.forecast)
+        forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
+        result.update(forecast=forecast, order=str(tuple(selection['order'])), rmse=float(rmse))
+    return result
+
+
+def _worker(ticker, start, end, run_forecast, run_alerts, timeout):
+    result = run_with_timeout(ticker, timeout, process_ticker, ticker, start, end, run_forecast, run_alerts)
+    result.setdefault('timings', {})
+    return result
+
+
+def _alert_rows(result):
+    alerts = result.get('alerts')
+    if alerts is None or alerts.empty:
+        return []
+    frame = alerts.reset_index().rename(columns={'index': 'Date'})
+    return [{'ticker': result['ticker'], 'date': row.Date, 'close': row.Close, 'rolling_mean': row.RollingMean,
+             'zscore': row.Zscore, 'anomaly': row.Anomaly} for row in frame.itertuples(index=False)]
+
+
+def run(tickers, start=DEFAULT_START, end=None, workers=None, run_forecast=True, run_alerts=True,
+        timeout=DEFAULT_TIMEOUT):
+    started = time.perf_counter()
+    run_at = datetime.now()
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    workers = workers or os.cpu_count() or 1
+
+    # one bulk download for the tickers that are not in the store yet; workers then read the store
+    prefetch_started = time.perf_counter()
+    try:
+        load_close_matrix(tickers, start=start, end=end)
+    except Exception:
+        pass
+    prefetch_seconds = time.perf_counter() - prefetch_started
+
+    results = {}
+    if workers == 1:
+        for ticker in tickers:
+            results[ticker] = _worker(ticker, start, end, run_forecast, run_alerts, timeout)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tickers))) as executor:
+            futures = {executor.submit(_worker, t, start, end, run_forecast, run_alerts, timeout): t
+                       for t in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    # the worker process itself died
+                    results[ticker] = {'ticker': ticker, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                                       'timings': {}, 'seconds': 0.0}
+
+    forecasts = pd.DataFrame([row for t in tickers for row in forecast_rows(results[t], run_at)],
+                             columns=['run_at', 'ticker', 'date', 'forecast_close', 'status', 'order', 'rmse',
+                                      'last_close', 'error'])
+    alerts = pd.DataFrame([row for t in tickers for row in _alert_rows(results[t])],
+                          columns=['ticker', 'date', 'close', 'rolling_mean', 'zscore', 'anomaly'])
+
+    timings = {'prefetch': {'total': prefetch_seconds, 'mean': prefetch_seconds, 'max': prefetch_seconds}}
+    for name in STAGES:
+        values = [r['timings'][name] for r in results.values() if name in r['timings']]
+        if values:
+            timings[name] = {'total': sum(values), 'mean': sum(values) / len(values), 'max': max(values)}
+    statuses = [r['status'] for r in results.values()]
+    stats = {
+        'tickers': len(tickers),
+        'ok': statuses.count('ok'),
+        'errors': statuses.count('error'),
+        'timeouts': statuses.count('timeout'),
+        'alerts': len(alerts),
+        'workers': workers,
+        'seconds': time.perf_counter() - started,
+        'timings': timings,
+    }
+    return forecasts, alerts, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run forecasts and z-score alerts without the web app.")
+    parser.add_argument('tickers', nargs='*', help="ticker symbols")
+    parser.add_argument('--watchlist', help="file with one ticker per line")
+    parser.add_argument('--start', default=DEFAULT_START, help="first date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=None, help="last date, exclusive (default: today)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="seconds allowed per ticker")
+    parser.add_argument('--skip-forecast', action='store_true', help="only run the z-score alerts")
+    parser.add_argument('--skip-alerts', action='store_true', help="only run the forecasts")
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--output-dir', default=os.path.join('.equinova', 'cli', f"{datetime.now():%Y-%m-%d}"))
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers + (read_watchlist(args.watchlist) if args.watchlist else [])
+    if not tickers:
+        parser.error("no tickers given")
+    forecasts, alerts, stats = run(tickers, start=args.start, end=args.end, workers=args.workers,
+                                   run_forecast=not args.skip_forecast, run_alerts=not args.skip_alerts,
+                                   timeout=args.timeout)
+
+    outputs = []
+    if not args.skip_forecast:
+        outputs.append(os.path.join(args.output_dir, f"forecasts.{args.format}"))
+        write_results(forecasts, outputs[-1])
+    if not args.skip_alerts:
+        outputs.append(os.path.join(args.output_dir, f"alerts.{args.format}"))
+        write_results(alerts, outputs[-1])
+
+    print(f"{stats['ok']}/{stats['tickers']} tickers processed ({stats['errors']} errors, {stats['timeouts']} timeouts), "
+          f"{stats['alerts']} alerts, in {stats['seconds']:.2f}s with {stats['workers']} workers")
+    print(f"{'stage':<14}{'total s':>10}{'mean s':>10}{'max s':>10}")
+    for name, t in stats['timings'].items():
+        print(f"{name:<14}{t['total']:>10.3f}{t['mean']:>10.3f}{t['max']:>10.3f}")
+    for path in outputs:
+        print(f"results written to {path}")
+    return 0 if stats['ok'] == stats['tickers'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pages.utils.providers import get_provider
+from pages.utils.profiler import timed
+from pages.utils.price_cache import PriceCache
+
+# On-disk OHLCV store, one Parquet partition per provider/interval/ticker:
+#   <STORE_DIR>/source=yahoo/interval=1d/ticker=AAPL/prices.parquet  (bars)
+#   <STORE_DIR>/source=yahoo/interval=1d/ticker=AAPL/coverage.json   (date range already fetched)
+# Requests only download the date ranges the partition does not cover yet.
+STORE_DIR = os.environ.get("EQUINOVA_STORE_DIR", os.path.join(".equinova", "prices"))
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# The bar of the current session keeps changing until the close, so the open
+# end of the range is refetched once it is older than this.
+TAIL_REFRESH = timedelta(minutes=15)
+
+_locks = {}
+_locks_guard = threading.Lock()
+# partitions already read, shared by all sessions as read-only views (see price_cache)
+_frames = PriceCache()
+
+
+def _version(prices_path):
+    stat = os.stat(prices_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _partition_dir(ticker, interval):
+    return os.path.join(STORE_DIR, f"source={get_provider().name}", f"interval={interval}", f"ticker={ticker}")
+
+
+def _lock_for(key):
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def _empty_frame():
+    frame = pd.DataFrame(columns=PRICE_COLUMNS, dtype='float64')
+    frame.index = pd.DatetimeIndex([], name='Date')
+    return frame
+
+
+@timed()
+def _fetch(ticker, start, end, interval):
+    data = get_provider().history(ticker, start=start, end=end, interval=interval,
+                                  auto_adjust=True, actions=False)
+    if data.empty:
+        return _empty_frame()
+    data = data[PRICE_COLUMNS]
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    data.index.name = 'Date'
+    return data
+
+
+def _read_partition(ticker, interval):
+    path = _partition_dir(ticker, interval)
+    prices_path = os.path.join(path, 'prices.parquet')
+    coverage_path = os.path.join(path, 'coverage.json')
+    if not os.path.exists(prices_path) or not os.path.exists(coverage_path):
+        return _empty_frame(), None
+
+    key = (get_provider().name, ticker, interval)
+    version = _version(prices_path)
+    cached = _frames.get(key, version)
+    if cached is not None:
+        return cached
+
+    frame = pd.read_parquet(prices_path)
+    with open(coverage_path) as f:
+        coverage = json.load(f)
+    return _frames.put(key, version, frame, coverage), coverage
+
+
+def _write_partition(ticker, interval, frame, coverage):
+    path = _partition_dir(ticker, interval)
+    os.makedirs(path, exist_ok=True)
+    prices_path = os.path.join(path, 'prices.parquet')
+    coverage_path = os.path.join(path, 'coverage.json')
+
+    # write-then-rename so concurrent readers never see a half written file
+    frame.to_parquet(prices_path + '.tmp')
+    os.replace(prices_path + '.tmp', prices_path)
+    with open(coverage_path + '.tmp', 'w') as f:
+        json.dump(coverage, f)
+    os.replace(coverage_path + '.tmp', coverage_path)
+    return _frames.put((get_provider().name, ticker, interval), _version(prices_path), frame, coverage)
+
+
+def _to_day(value):
+    if value is None:
+        return None
+    return pd.Timestamp(value).normalize()
+
+
+def _missing_ranges(coverage, start, end, today, now):
+    # start=None means "from the first available bar" (period='max')
+    if coverage is None:
+        return [(start, end)]
+
+    covered_start = None if coverage['start'] is None else pd.Timestamp(coverage['start'])
+    covered_end = pd.Timestamp(coverage['end'])
+    tail_fetched_at = datetime.fromisoformat(coverage['tail_fetched_at'])
+
+    ranges = []
+    if covered_start is not None and (start is None or start < covered_start):
+        ranges.append((start, covered_start))
+    if end > covered_end:
+        if covered_end < today or now - tail_fetched_at > TAIL_REFRESH:
+            ranges.append((covered_end, end))
+    return ranges
+
+
+@timed()
+def load_prices(ticker, start=None, end=None, period=None, interval='1d'):
+    ticker = ticker.strip().upper()
+    now = datetime.now()
+    today = pd.Timestamp(now.date())
+    start = None if period == 'max' else _to_day(start)
+    end = _to_day(end) if end is not None else today + pd.Timedelta(days=1)
+
+    with _lock_for((ticker, interval)):
+        frame, coverage = _read_partition(ticker, interval)
+        missing = _missing_ranges(coverage, start, end, today, now)
+        if missing:
+            try:
+                fetched = [_fetch(ticker, lo, hi, interval) for lo, hi in missing]
+            except Exception:
+                # like yf.download, fail soft and serve whatever is already on disk
+                fetched = []
+
+            if fetched:
+                parts = [f for f in [frame] + fetched if not f.empty]
+                if parts:
+                    frame = pd.concat(parts)
+                    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+
+                if coverage is None:
+                    new_start, new_end = start, end
+                    tail_fetched_at = now
+                else:
+                    old_start = None if coverage['start'] is None else pd.Timestamp(coverage['start'])
+                    new_start = None if start is None or old_start is None else min(start, old_start)
+                    new_end = max(end, pd.Timestamp(coverage['end']))
+                    tail_fetched_at = now if end > today else datetime.fromisoformat(coverage['tail_fetched_at'])
+                coverage = {
+                    'start': None if new_start is None else new_start.strftime('%Y-%m-%d'),
+                    # the running session is never marked as fully covered
+                    'end': min(new_end, today).strftime('%Y-%m-%d'),
+                    'tail_fetched_at': tail_fetched_at.isoformat(),
+                }
+                frame = _write_partition(ticker, interval, frame, coverage)
+
+    lo = 0 if start is None else frame.index.searchsorted(start, side='left')
+    hi = frame.index.searchsorted(end, side='left')
+    return frame.iloc[lo:hi]
+
+
+def _prefetch(tickers, start, end, interval):
+    # tickers the store has never seen are fetched with one bulk download
+    cold = [t for t in tickers if _read_partition(t, interval)[1] is None]
+    if len(cold) < 2 or interval != '1d':
+        return
+    try:
+        data = get_provider().download(cold, start=start, end=end, interval=interval, group_by='ticker')
+    except Exception:
+        return
+
+    now = datetime.now()
+    today = pd.Timestamp(now.date())
+    available = set(data.columns.get_level_values(0)) if not data.empty else set()
+    for ticker in cold:
+        if ticker not in available:
+            continue
+        frame = data[ticker][PRICE_COLUMNS].dropna(how='all')
+        if frame.empty:
+            # failed symbols come back as empty columns, leave them to the per-ticker path
+            continue
+        frame.index.name = 'Date'
+        coverage = {
+            'start': None if start is None else start.strftime('%Y-%m-%d'),
+            'end': min(end, today).strftime('%Y-%m-%d'),
+            'tail_fetched_at': now.isoformat(),
+        }
+        with _lock_for((ticker, interval)):
+            if _read_partition(ticker, interval)[1] is None:
+                _write_partition(ticker, interval, frame, coverage)
+
+
+@timed()
+def load_close_matrix(tickers, start=None, end=None, period=None, interval='1d'):
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    today = pd.Timestamp(datetime.now().date())
+    _prefetch(tickers, None if period == 'max' else _to_day(start),
+              _to_day(end) if end is not None else today + pd.Timedelta(days=1), interval)
+    closes = {t: load_prices(t, start=start, end=end, period=period, interval=interval)['Close'] for t in tickers}
+    indexes = [c.index for c in closes.values()]
+    if indexes and all(len(ix) == len(indexes[0]) and ix.equals(indexes[0]) for ix in indexes[1:]):
+        # one shared calendar (the usual case for one market): stack the columns without aligning
+        return pd.DataFrame(np.column_stack([c.values for c in closes.values()]), index=indexes[0],
+                            columns=pd.Index(list(closes)))
+    return pd.concat(closes, axis=1).sort_index()
+
+
+def fingerprint(data):
+    # identifies one version of a price series, used as a cache key by the model layer
+    values = np.ascontiguousarray(np.asarray(data, dtype='float64'))
+    return hashlib.sha1(values.tobytes()).hexdigest()[:16]
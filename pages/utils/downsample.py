@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Server-side decimation for long-history charts. A chart cannot show more
+# points than it has horizontal pixels, so series longer than the point budget
+# are reduced before they are serialised into the figure:
+#   lttb_indices    Largest-Triangle-Three-Buckets, keeps the visual shape of lines
+#   minmax_indices  the lowest and highest point of every bucket, keeps spikes (bars)
+#   ohlc_buckets    merges consecutive candles (first open, max high, min low, last close)
+CHART_WIDTH = 1200
+POINTS_PER_PIXEL = 2
+CANDLE_PIXELS = 3
+# traces with more points than this are drawn with WebGL (Scattergl); kept below
+# point_budget() so a decimated long-history line still gets it
+WEBGL_THRESHOLD = 1000
+
+
+def point_budget(width=CHART_WIDTH):
+    return width * POINTS_PER_PIXEL
+
+
+def candle_budget(width=CHART_WIDTH):
+    return width // CANDLE_PIXELS
+
+
+def _bucket_edges(n, n_buckets):
+    return np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+
+def lttb_indices(y, n_out):
+    # positions of the n_out points of y (evenly spaced x) chosen by LTTB
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # the first and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = 1 + _bucket_edges(n - 2, n_out - 2)
+    x = np.arange(n, dtype='float64')
+    # centroid of every bucket, plus the last point as the centroid after the final bucket
+    sums = np.add.reduceat(y[1:-1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.r_[(edges[:-1] + edges[1:] - 1) / 2, n - 1]
+    avg_y = np.r_[sums / counts, y[-1]]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    # positions of the minimum and maximum of n_out // 2 buckets, in order
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    edges = _bucket_edges(n, n_buckets)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # argmin / argmax per bucket through a lexicographic sort on (bucket, value)
+    order = np.lexsort((y, bucket))
+    lows = order[edges[:-1]]
+    highs = order[edges[1:] - 1]
+    return np.unique(np.r_[lows, highs])
+
+
+def decimate(series, n_out, method='lttb'):
+    # series indexed by date; NaN points (indicator warm-up) are left out before picking
+    finite = np.flatnonzero(np.isfinite(series.to_numpy(dtype='float64')))
+    if len(finite) <= n_out:
+        return series.iloc[finite] if len(finite) < len(series) else series
+    values = series.to_numpy(dtype='float64')[finite]
+    pick = lttb_indices(values, n_out) if method == 'lttb' else minmax_indices(values, n_out)
+    return series.iloc[finite[pick]]
+
+
+def ohlc_buckets(dataframe, n_out):
+    # merges runs of consecutive bars so at most n_out candles remain; each candle is dated by its first bar
+    n = len(dataframe)
+    if n <= n_out:
+        return dataframe
+    starts = _bucket_edges(n, n_out)[:-1]
+    ends = np.r_[starts[1:], n] - 1
+    return pd.DataFrame({
+        'Open': dataframe['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(dataframe['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(dataframe['Low'].to_numpy(), starts),
+        'Close': dataframe['Close'].to_numpy()[ends],
+    }, index=dataframe.index[starts])
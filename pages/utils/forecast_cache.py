@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import warnings
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from pages.utils.model_train import get_data, get_rolling_mean
+from pages.utils.model_store import update_model
+from pages.utils.data_store import fingerprint
+from pages.utils.batch_forecast import read_watchlist
+from pages.utils.profiler import timed
+
+# Finished Price Forecast results (forecast frame, RMSE, relative RMSE and the
+# chosen order), keyed by ticker, last bar date, the bars' fingerprint and model configuration:
+#   <CACHE_DIR>/<TICKER>.json
+# A page view for a cached key does no model work at all; the first view of an
+# uncached key computes and stores it. The warm-up job fills the cache for a
+# watchlist once the day's bars are final:
+#   python -m pages.utils.forecast_cache --watchlist watchlist.txt            (once, e.g. from cron)
+#   python -m pages.utils.forecast_cache --watchlist watchlist.txt --daily    (stays up, runs after every close)
+CACHE_DIR = os.environ.get("EQUINOVA_FORECAST_CACHE", os.path.join(".equinova", "forecast_cache"))
+WARMUP_TICKERS = os.environ.get("EQUINOVA_WARMUP_TICKERS", "")
+MARKET_TZ = ZoneInfo("America/New_York")
+WARMUP_AT = "16:30"
+MAX_MEMORY = 256
+
+# everything that changes the result for the same bars; bump 'version' when the pipeline changes
+MODEL_CONFIG = {'version': 3, 'rolling_window': 7, 'holdout': 30, 'steps': 30, 'criterion': 'aic',
+                'max_p': 5, 'max_q': 5}
+
+_memory = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(ticker):
+    with _locks_guard:
+        if ticker not in _locks:
+            _locks[ticker] = threading.Lock()
+        return _locks[ticker]
+
+
+def config_id(config=None):
+    config = MODEL_CONFIG if config is None else config
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def forecast_key(ticker, close_price, config=None):
+    # the fingerprint changes with every revision of the bars, including the still-forming last one,
+    # so a forecast built intraday is never served for the final bars of the session
+    return (f"{ticker}|{pd.Timestamp(close_price.index[-1]):%Y-%m-%d}|{fingerprint(close_price['Close'].values)}|"
+            f"{config_id(config)}")
+
+
+def _path(ticker):
+    return os.path.join(CACHE_DIR, f"{ticker}.json")
+
+
+def _to_record(entry):
+    forecast = entry['forecast']['Close']
+    return dict(entry, forecast={'dates': [f"{d:%Y-%m-%d}" for d in forecast.index],
+                                 'close': [float(v) for v in forecast.values]})
+
+
+def _from_record(record):
+    forecast = pd.DataFrame({'Close': record['forecast']['close']},
+                            index=pd.DatetimeIndex(record['forecast']['dates']))
+    return dict(record, forecast=forecast, order=tuple(record['order']))
+
+
+def _read(ticker, key):
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        record = json.load(f).get(key)
+    return None if record is None else _from_record(record)
+
+
+def _write(ticker, key, entry):
+    path = _path(ticker)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # only the current bars matter, so the file is replaced rather than merged
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({key: _to_record(entry)}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def compute_forecast(ticker, close_price=None, config=None, max_workers=1):
+    # the Price Forecast pipeline on the ticker's stored model: new bars extend it, and the
+    # order search on the training slice plus a fit only run when it is refitted from scratch
+    config = MODEL_CONFIG if config is None else config
+    started = time.perf_counter()
+    close_price = get_data(ticker) if close_price is None else close_price
+    if close_price.empty:
+        raise ValueError("no price data")
+    holdout = config['holdout']
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        rolling_price = get_rolling_mean(close_price)
+        update = update_model(ticker, rolling_price, steps=config['steps'], holdout=holdout,
+                              search={k: config[k] for k in ('criterion', 'max_p', 'max_q')},
+                              max_workers=max_workers)
+
+    mean_price = float(close_price['Close'].iloc[-holdout:].mean())
+    return {
+        'ticker': ticker,
+        'last_date': f"{close_price.index[-1]:%Y-%m-%d}",
+        'forecast': update['forecast'],
+        'rmse': update['rmse'],
+        'rel_rmse': update['rmse'] / mean_price * 100,
+        'mean_price': mean_price,
+        'order': tuple(update['order']),
+        'differencing_order': int(update['order'][1]),
+        'selection': update['selection'],
+        'model_update': update['mode'],
+        'computed_at': datetime.now().isoformat(timespec='seconds'),
+        'compute_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+@timed()
+def cached_forecast(ticker, close_price=None, config=None, max_workers=1):
+    # the stored result for the ticker's current bars; computed and stored on a miss.
+    # The order search stays serial by default: the page calls this inside the threaded
+    # Streamlit server, where forking a process pool can deadlock on locks other threads hold
+    ticker = ticker.strip().upper()
+    close_price = get_data(ticker) if close_price is None else close_price
+    if close_price.empty:
+        raise ValueError("no price data")
+    key = forecast_key(ticker, close_price, config)
+
+    # one computation per ticker at a time; concurrent views of the same ticker wait for it
+    with _lock_for(ticker):
+        entry = _memory.get(key)
+        if entry is None:
+            entry = _read(ticker, key)
+        if entry is not None:
+            _memory[key] = entry
+            return dict(entry, cached=True)
+
+        entry = compute_forecast(ticker, close_price, config, max_workers)
+        _write(ticker, key, entry)
+        for old in [k for k in _memory if k.startswith(f"{ticker}|")]:
+            del _memory[old]
+        if len(_memory) >= MAX_MEMORY:
+            del _memory[next(iter(_memory))]
+        _memory[key] = entry
+    return dict(entry, cached=False)
+
+
+def _warm_worker(ticker):
+    started = time.perf_counter()
+    try:
+        # already running inside a pool worker, so the order search stays serial
+        entry = cached_forecast(ticker, max_workers=1)
+        return {'ticker': ticker, 'status': 'cached' if entry['cached'] else 'computed',
+                'seconds': time.perf_counter() - started}
+    except Exception as e:
+        return {'ticker': ticker, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                'seconds': time.perf_counter() - started}
+
+
+def warm_up(tickers, workers=None):
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    if not tickers:
+        return {}
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(tickers))) as executor:
+        futures = {executor.submit(_warm_worker, t): t for t in tickers}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def next_warmup(now=None, at=WARMUP_AT):
+    # the next weekday at `at` market time, i.e. after the close
+    now = now or datetime.now(MARKET_TZ)
+    hour, minute = map(int, at.split(':'))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    while run_at.weekday() >= 5:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def _report(results, seconds):
+    for ticker, result in results.items():
+        if result['status'] == 'error':
+            print(f"{ticker}: {result['error']}")
+    computed = sum(r['status'] == 'computed' for r in results.values())
+    cached = sum(r['status'] == 'cached' for r in results.values())
+    print(f"{computed} computed, {cached} already cached, {len(results) - computed - cached} failed, "
+          f"in {seconds:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute Price Forecast results for a watchlist.")
+    parser.add_argument('tickers', nargs='*', help="ticker symbols (default: EQUINOVA_WARMUP_TICKERS)")
+    parser.add_argument('--watchlist', help="file with one ticker per line")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--daily', action='store_true', help="keep running, warm up after every market close")
+    parser.add_argument('--at', default=WARMUP_AT, help="warm-up time in US/Eastern with --daily (HH:MM)")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers + (read_watchlist(args.watchlist) if args.watchlist else [])
+    tickers = tickers or WARMUP_TICKERS.split(',')
+    if not any(t.strip() for t in tickers):
+        parser.error("no tickers given")
+    while True:
+        if args.daily:
+            run_at = next_warmup(at=args.at)
+            print(f"next warm-up at {run_at:%Y-%m-%d %H:%M %Z}")
+            time.sleep(max(0.0, (run_at - datetime.now(MARKET_TZ)).total_seconds()))
+        started = time.perf_counter()
+        results = warm_up(tickers, args.workers)
+        _report(results, time.perf_counter() - started)
+        if not args.daily:
+            return 0 if all(r['status'] != 'error' for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
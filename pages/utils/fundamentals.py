@@ -0,0 +1,82 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from pages.utils.providers import get_provider
+from pages.utils.profiler import timed
+
+# Company fundamentals (provider `info`) shared by every session of the process.
+# - An entry is fresh for FUNDAMENTALS_TTL seconds.
+# - Concurrent requests for a ticker that is not cached wait on one fetch.
+# - A stale entry is returned immediately while a background thread refreshes
+#   it, so only the very first request for a ticker waits on the network.
+# The returned dicts are shared between sessions and must not be modified.
+FUNDAMENTALS_TTL = float(os.environ.get("EQUINOVA_FUNDAMENTALS_TTL", 6 * 3600))
+MAX_TICKERS = 512
+REFRESH_WORKERS = 4
+
+_cache = OrderedDict()
+_inflight = {}
+_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='fundamentals')
+
+
+def _fetch(key, future):
+    provider_name, ticker = key
+    try:
+        provider = get_provider()
+        if provider.name != provider_name:
+            raise RuntimeError(f"Provider changed from {provider_name} to {provider.name}")
+        info = provider.info(ticker)
+    except Exception as e:
+        with _lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        return
+    with _lock:
+        _cache[key] = (time.monotonic(), info)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_TICKERS:
+            _cache.popitem(last=False)
+        _inflight.pop(key, None)
+    future.set_result(info)
+
+
+@timed()
+def get_fundamentals(ticker, ttl=None):
+    ttl = FUNDAMENTALS_TTL if ttl is None else ttl
+    key = (get_provider().name, ticker.upper())
+    with _lock:
+        cached = _cache.get(key)
+        future = _inflight.get(key)
+        owner = future is None and (cached is None or time.monotonic() - cached[0] > ttl)
+        if owner:
+            future = _inflight[key] = Future()
+        if cached is not None:
+            _cache.move_to_end(key)
+
+    if cached is not None:
+        if owner:
+            # stale: serve it now and refresh in the background (a failed refresh keeps the old value)
+            _refresher.submit(_fetch, key, future)
+        return cached[1]
+    if owner:
+        _fetch(key, future)
+    return future.result()
+
+
+def fundamentals_age(ticker):
+    # seconds since the cached fundamentals were fetched, None when not cached
+    with _lock:
+        cached = _cache.get((get_provider().name, ticker.upper()))
+    return None if cached is None else time.monotonic() - cached[0]
+
+
+def invalidate(ticker=None):
+    with _lock:
+        if ticker is None:
+            _cache.clear()
+        else:
+            _cache.pop((get_provider().name, ticker.upper()), None)
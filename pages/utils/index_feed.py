@@ -0,0 +1,127 @@
+import os
+import time
+import threading
+from datetime import datetime
+
+import pandas as pd
+from pages.utils.providers import get_provider
+
+# Process-wide quotes for the landing-page index cards. One daemon thread pulls
+# 1-minute bars every REFRESH_SECONDS and publishes an immutable snapshot that
+# all sessions read, so a visit to the landing page makes no network calls.
+# After the first pull only the minutes since the last stored bar are requested.
+INDEX_TICKERS = {
+    "S&P 500": "^GSPC",
+    "NASDAQ": "^IXIC",
+    "DOW JONES": "^DJI",
+}
+REFRESH_SECONDS = float(os.environ.get("EQUINOVA_INDEX_REFRESH", 60))
+# the change shown on a card is measured against this many bars back
+CHANGE_LOOKBACK = 5
+FIRST_SNAPSHOT_TIMEOUT = 15
+
+_UNAVAILABLE = {'last': 'N/A', 'change': 'N/A', 'status': 'neutral'}
+
+
+def _cards(closes):
+    cards = {}
+    for name, symbol in INDEX_TICKERS.items():
+        try:
+            close = closes[symbol].dropna()
+            last = close.iloc[-1]
+            prev = close.iloc[-CHANGE_LOOKBACK]
+            change = ((last - prev) / prev) * 100
+            cards[name] = {
+                'last': round(last, 2),
+                'change': round(change, 2),
+                'status': 'up' if change > 0 else 'down'
+            }
+        except Exception:
+            cards[name] = dict(_UNAVAILABLE)
+    return cards
+
+
+class IndexRefresher:
+    def __init__(self, refresh_seconds=REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._closes = None
+        self._intraday = False
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _pull(self):
+        provider = get_provider()
+        symbols = list(INDEX_TICKERS.values())
+        if self._closes is not None and self._intraday:
+            # only the minutes since the last stored bar; that bar is fetched again as it may have been revised
+            new = provider.download(symbols, start=self._closes.index[-1], interval="1m", group_by="column")
+            if not new.empty:
+                closes = pd.concat([self._closes, new['Close']])
+                closes = closes[~closes.index.duplicated(keep='last')].sort_index()
+                # keep the latest session only, as period="1d" would
+                session = closes.index[-1].date()
+                self._closes = closes[closes.index.date == session]
+            return
+        data = provider.download(symbols, period="1d", interval="1m", group_by="column")
+        self._intraday = not data.empty
+        if data.empty:
+            # fallback if intraday data is unavailable
+            data = provider.download(symbols, period="5d", interval="1d", group_by="column")
+        self._closes = data['Close']
+
+    def refresh(self):
+        try:
+            self._pull()
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if self._closes is None:
+            cards = {name: dict(_UNAVAILABLE) for name in INDEX_TICKERS}
+            as_of = None
+        else:
+            cards = _cards(self._closes)
+            as_of = self._closes.index[-1] if len(self._closes) else None
+        previous = self._snapshot
+        # a failed pull keeps the previous quotes; their age keeps growing
+        if error is None or previous is None:
+            self._snapshot = {'cards': cards, 'as_of': as_of, 'updated_at': time.time(),
+                              'updated': datetime.now(), 'error': error}
+        else:
+            self._snapshot = dict(previous, error=error)
+        self._ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.refresh()
+            self._stop.wait(max(0.0, self.refresh_seconds - (time.monotonic() - started)))
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='index-refresher', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self, timeout=FIRST_SNAPSHOT_TIMEOUT):
+        # latest snapshot plus its age in seconds; only waits before the very first pull completes
+        self.start()
+        self._ready.wait(timeout)
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'cards': {name: dict(_UNAVAILABLE) for name in INDEX_TICKERS}, 'as_of': None,
+                    'updated': None, 'error': 'no data yet', 'age': None}
+        return dict(snapshot, age=time.time() - snapshot['updated_at'])
+
+
+_refresher = IndexRefresher()
+
+
+def get_index_snapshot():
+    return _refresher.snapshot()
@@ -0,0 +1,213 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from pages.utils.profiler import timed
+
+# Technical indicators (RSI, MACD / signal / histogram, SMA 50) with the same
+# definitions and warm-up NaNs as the `ta` package, cached per ticker.
+#
+# Every indicator is a recursion over the closes, so the engine keeps the
+# recursion state at the second-to-last bar. When the data for a ticker grows
+# (or its last, still-forming bar changes) only the bars after that checkpoint
+# are computed. Requests for a short visible window on a ticker that is not
+# cached yet only compute the window plus WARMUP bars.
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+SMA_WINDOW = 50
+# the EMA seeds decay as (1 - alpha) ** WARMUP, below 1e-6 for every window used here
+WARMUP = 250
+MAX_TICKERS = 64
+COLUMNS = ['RSI', 'MACD', 'Signal', 'Histogram', 'SMA_50']
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _initial_state():
+    return {'n': 0, 'last_close': np.nan, 'ema_up': np.nan, 'ema_dn': np.nan,
+            'fast': np.nan, 'slow': np.nan, 'signal': np.nan, 'tail': np.empty(0)}
+
+
+def _ewm(previous, values, alpha):
+    # adjust=False recursion continued from `previous`; a NaN seed starts at the first valid value
+    return pd.Series(np.r_[previous, values]).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _advance(state, closes):
+    pos = state['n'] + np.arange(len(closes))
+    diff = np.diff(np.r_[state['last_close'], closes])
+    up = np.where(diff > 0, diff, 0.0)
+    dn = np.where(diff < 0, -diff, 0.0)
+
+    raw = {
+        'ema_up': _ewm(state['ema_up'], up, 1 / RSI_WINDOW),
+        'ema_dn': _ewm(state['ema_dn'], dn, 1 / RSI_WINDOW),
+        'fast': _ewm(state['fast'], closes, 2 / (MACD_FAST + 1)),
+        'slow': _ewm(state['slow'], closes, 2 / (MACD_SLOW + 1)),
+    }
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = np.where(raw['ema_dn'] == 0, 100.0, 100 - 100 / (1 + raw['ema_up'] / raw['ema_dn']))
+    rsi[pos < RSI_WINDOW - 1] = np.nan
+    macd = raw['fast'] - raw['slow']
+    macd[pos < MACD_SLOW - 1] = np.nan
+    raw['signal'] = _ewm(state['signal'], macd, 2 / (MACD_SIGNAL + 1))
+    signal = raw['signal'].copy()
+    signal[pos < MACD_SLOW + MACD_SIGNAL - 2] = np.nan
+
+    window = np.r_[state['tail'], closes]
+    sums = np.cumsum(np.r_[0.0, window])
+    sma = np.full(len(window), np.nan)
+    sma[SMA_WINDOW - 1:] = (sums[SMA_WINDOW:] - sums[:-SMA_WINDOW]) / SMA_WINDOW
+    sma = sma[len(state['tail']):]
+    sma[pos < SMA_WINDOW - 1] = np.nan
+
+    values = {'RSI': rsi, 'MACD': macd, 'Signal': signal, 'Histogram': macd - signal, 'SMA_50': sma}
+    return values, raw, window
+
+
+def _state_at(state, closes, raw, window, j):
+    # recursion state after the j-th of the newly processed closes
+    tail_end = len(state['tail']) + j + 1
+    return {
+        'n': state['n'] + j + 1,
+        'last_close': closes[j],
+        'ema_up': raw['ema_up'][j], 'ema_dn': raw['ema_dn'][j],
+        'fast': raw['fast'][j], 'slow': raw['slow'][j], 'signal': raw['signal'][j],
+        'tail': window[max(0, tail_end - (SMA_WINDOW - 1)):tail_end].copy(),
+    }
+
+
+def _new_entry(close, offset):
+    closes = close.to_numpy(dtype='float64')[offset:]
+    start = _initial_state()
+    values, raw, window = _advance(start, closes)
+    return {
+        'offset': offset,
+        'valid_from': 0 if offset == 0 else offset + WARMUP,
+        'first': (close.index[0], close.iloc[0]),
+        'index': close.index[offset:],
+        'closes': closes,
+        'values': values,
+        'checkpoint': _state_at(start, closes, raw, window, len(closes) - 2) if len(closes) > 1 else start,
+    }
+
+
+def _extend_entry(entry, close):
+    # recompute from the checkpoint (second-to-last cached bar) up to the end of `close`
+    offset = entry['offset']
+    keep = len(entry['closes']) - 1
+    closes = close.to_numpy(dtype='float64')[offset + keep:]
+    checkpoint = entry['checkpoint']
+    values, raw, window = _advance(checkpoint, closes)
+    entry['values'] = {c: np.r_[entry['values'][c][:keep], values[c]] for c in COLUMNS}
+    entry['closes'] = np.r_[entry['closes'][:keep], closes]
+    entry['index'] = close.index[offset:]
+    if len(closes) > 1:
+        entry['checkpoint'] = _state_at(checkpoint, closes, raw, window, len(closes) - 2)
+    return entry
+
+
+def _matches(entry, close):
+    length = entry['offset'] + len(entry['closes'])
+    if len(close) < length or length < 2 or (close.index[0], close.iloc[0]) != entry['first']:
+        return False
+    # everything up to the checkpoint must be unchanged; the last cached bar may be revised
+    k = length - 2
+    return close.index[k] == entry['index'][k - entry['offset']] and close.iloc[k] == entry['closes'][k - entry['offset']]
+
+
+@timed()
+def compute_indicators(close, ticker=None, start=0):
+    # close: Series of closes indexed by date; returns the indicators for close.iloc[start:]
+    start = max(0, min(start, len(close)))
+    # skipping only a short prefix is not worth losing exactness
+    offset = start - WARMUP if start - WARMUP >= WARMUP else 0
+    if ticker is None:
+        entry = _new_entry(close, offset)
+    else:
+        with _lock:
+            entry = _cache.get(ticker)
+            if entry is not None and _matches(entry, close) and start >= entry['valid_from']:
+                length = entry['offset'] + len(entry['closes'])
+                if len(close) > length or close.iloc[-1] != entry['closes'][-1]:
+                    entry = _extend_entry(entry, close)
+            else:
+                entry = _new_entry(close, offset)
+            _cache[ticker] = entry
+            _cache.move_to_end(ticker)
+            while len(_cache) > MAX_TICKERS:
+                _cache.popitem(last=False)
+
+    lo, hi = start - entry['offset'], len(close) - entry['offset']
+    return pd.DataFrame({c: entry['values'][c][lo:hi] for c in COLUMNS}, index=close.index[start:])
+
+
+# The same indicators for a whole universe at once, on a dates x tickers array.
+# Each column follows `ta` on that ticker's own series: recursions start at the
+# column's first close, so names listed later are handled exactly. Gaps after
+# the first close must be filled beforehand. The recursions step through the
+# dates, and every step updates all tickers (and all EMAs) in one operation.
+def _first_valid(values):
+    # row of each column's first value (len(values) for an empty column)
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), np.argmax(valid, axis=0), len(values))
+
+
+def _before(values, first, bars=0):
+    # True where a column has fewer than bars + 1 values so far
+    return np.arange(len(values))[:, None] < first[None, :] + bars
+
+
+def ema_matrix(values, alphas, first=None):
+    # adjust=False EWM down the columns, NaN before each column's first value;
+    # alphas broadcasts against one row, first is _first_valid(values) when already known
+    values = np.asarray(values, dtype='float64')
+    first = _first_valid(values) if first is None else first
+    before = _before(values, first)
+    # a column held at its first value ahead of it leaves the recursion exactly there
+    values = np.where(before, values[np.minimum(first, len(values) - 1), np.arange(values.shape[1])], values)
+    out = np.empty_like(values)
+    out[0] = values[0]
+    for t in range(1, len(values)):
+        np.subtract(values[t], out[t - 1], out=out[t])
+        out[t] *= alphas
+        out[t] += out[t - 1]
+    np.copyto(out, np.nan, where=before)
+    return out
+
+
+def indicator_matrices(closes):
+    # closes: dates x tickers array; returns {column: dates x tickers array} for COLUMNS
+    closes = np.asarray(closes, dtype='float64')
+    n_tickers = closes.shape[1]
+    first = _first_valid(closes)
+
+    diff = np.full_like(closes, np.nan)
+    diff[1:] = closes[1:] - closes[:-1]
+    up = np.where(diff > 0, diff, 0.0)
+    dn = np.where(diff < 0, -diff, 0.0)
+    before = _before(closes, first)
+    np.copyto(up, np.nan, where=before)
+    np.copyto(dn, np.nan, where=before)
+
+    # the four EMAs on the closes and their changes share one pass over the dates
+    alphas = np.repeat([1 / RSI_WINDOW, 1 / RSI_WINDOW, 2 / (MACD_FAST + 1), 2 / (MACD_SLOW + 1)], n_tickers)
+    ema = ema_matrix(np.hstack([up, dn, closes, closes]), alphas, np.tile(first, 4))
+    ema_up, ema_dn, fast, slow = np.hsplit(ema, 4)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = np.where(ema_dn == 0, 100.0, 100 - 100 / (1 + ema_up / ema_dn))
+    np.copyto(rsi, np.nan, where=_before(closes, first, RSI_WINDOW - 1))
+    macd = fast - slow
+    np.copyto(macd, np.nan, where=_before(closes, first, MACD_SLOW - 1))
+    signal = ema_matrix(macd, 2 / (MACD_SIGNAL + 1), np.minimum(first + MACD_SLOW - 1, len(closes)))
+    np.copyto(signal, np.nan, where=_before(closes, first, MACD_SLOW + MACD_SIGNAL - 2))
+
+    sums = np.cumsum(np.r_[np.zeros((1, n_tickers)), np.nan_to_num(closes)], axis=0)
+    sma = np.full_like(closes, np.nan)
+    sma[SMA_WINDOW - 1:] = (sums[SMA_WINDOW:] - sums[:-SMA_WINDOW]) / SMA_WINDOW
+    np.copyto(sma, np.nan, where=_before(closes, first, SMA_WINDOW - 1))
+
+    return {'RSI': rsi, 'MACD': macd, 'Signal': signal, 'Histogram': macd - signal, 'SMA_50': sma}
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Small JSON results memoized across processes (the page server, pool workers,
+# batch jobs), one file per key:
+#   <directory>/<GROUP>/<sha1 of the key>.json
+# A file is written once, atomically, and never rewritten, so concurrent writers
+# of different keys cannot drop each other's entries. Keys embed a data
+# fingerprint, so every new bar adds one; only the `keep` most recent files of a
+# group (a ticker) are kept. Reads go to process memory first, then to the file.
+KEEP = 8
+MAX_MEMORY = 1024
+
+
+class JsonCache:
+    def __init__(self, directory, keep=KEEP, max_memory=MAX_MEMORY):
+        self.directory = directory
+        self.keep = keep
+        self.max_memory = max_memory
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key, group):
+        name = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, group or '_', f"{name}.json")
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def get(self, key, group=None):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+        try:
+            with open(self._path(key, group)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('key') != key:
+            return None
+        with self._lock:
+            self._remember(key, record['value'])
+        return record['value']
+
+    def put(self, key, value, group=None):
+        with self._lock:
+            self._remember(key, value)
+        path = self._path(key, group)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': key, 'value': value}, f, indent=1)
+            os.replace(tmp_path, path)
+            self._prune(os.path.dirname(path))
+        except OSError:
+            # no usable cache directory, the entry stays in process memory
+            pass
+
+    def _prune(self, group_dir):
+        entries = []
+        for name in os.listdir(group_dir):
+            if name.endswith('.json'):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(group_dir, name)), name))
+                except OSError:
+                    pass
+        for _, name in sorted(entries, reverse=True)[self.keep:]:
+            try:
+                os.remove(os.path.join(group_dir, name))
+            except OSError:
+                pass
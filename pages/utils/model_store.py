@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import pickle
+import warnings
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from pages.utils.model_train import get_differencing_order, scaling, inverse_scaling, forecast_frame
+from pages.utils.order_search import select_order
+
+# Fitted forecast models persisted per ticker:
+#   <MODEL_DIR>/<TICKER>/model.pickle  fitted results (parameters + state-space state) and scaler
+#   <MODEL_DIR>/<TICKER>/state.json    order, last observation, fit timestamps
+# The stored state is a checkpoint one bar before the end of the series: the
+# last bar can still be forming (data_store refetches it during the session),
+# so it is never part of what is stored, and a revision of it is simply
+# re-read. New bars, that one included, are filtered through the checkpoint
+# (results.extend), which only touches the new observations. Large one-step errors on the new bars trigger a
+# refit warm-started from the stored parameters; a full refit from scratch only
+# happens every REFIT_EVERY. forecast_cache.compute_forecast (the Price Forecast
+# page and the after-close warm-up) goes through update_model.
+MODEL_DIR = os.environ.get("EQUINOVA_MODEL_DIR", os.path.join(".equinova", "models"))
+REFIT_EVERY = timedelta(days=7)
+DRIFT_THRESHOLD = 3.0
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(ticker):
+    with _locks_guard:
+        if ticker not in _locks:
+            _locks[ticker] = threading.Lock()
+        return _locks[ticker]
+
+
+def _paths(ticker):
+    path = os.path.join(MODEL_DIR, ticker)
+    return os.path.join(path, 'model.pickle'), os.path.join(path, 'state.json')
+
+
+def load_model(ticker):
+    model_path, state_path = _paths(ticker)
+    if not os.path.exists(model_path) or not os.path.exists(state_path):
+        return None, None
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    with open(state_path) as f:
+        state = json.load(f)
+    return model, state
+
+
+def save_model(ticker, model, state):
+    model_path, state_path = _paths(ticker)
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(model_path + '.tmp', 'wb') as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(model_path + '.tmp', model_path)
+    with open(state_path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=1)
+    os.replace(state_path + '.tmp', state_path)
+
+
+def _fit(scaled, order, start_params=None):
+    from statsmodels.tsa.arima.model import ARIMA
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return ARIMA(scaled, order=order).fit(start_params=start_params)
+
+
+def _full_fit(ticker, series, order, holdout=0, search=None, max_workers=None):
+    # the checkpoint for every bar but the last. With a holdout the order is searched and the
+    # parameters estimated on the bars before it, then the rest is filtered through the fitted state
+    scaled, scaler = scaling(series)
+    train = scaled[:len(scaled) - max(holdout, 1)]
+    selection = None
+    if order is None:
+        d = get_differencing_order(series, ticker=ticker)
+        found = select_order(train, d, ticker=ticker, max_workers=max_workers, **(search or {}))
+        order = found['order']
+        selection = {k: found[k] for k in ('criterion', 'n_fitted', 'n_skipped', 'search_seconds', 'cached')}
+    results = _fit(train, tuple(order))
+    if len(train) < len(scaled) - 1:
+        results = results.append(scaled[len(train):-1])
+    return results, scaler, tuple(order), selection
+
+
+def _holdout_rmse(results, series, scaler, order, holdout):
+    # the last `holdout` bars forecast from the bar before them with the model's parameters, in price units
+    from statsmodels.tsa.arima.model import ARIMA
+    scaled = scaler.transform(series.values.reshape(-1, 1))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        before = ARIMA(scaled[:-holdout], order=order).filter(results.params)
+    predictions = before.get_forecast(steps=holdout).predicted_mean
+    errors = series.values[-holdout:] - inverse_scaling(scaler, predictions).ravel()
+    return round(float(np.sqrt(np.mean(errors ** 2))), 2)
+
+
+def _state(series, order, results, fitted_at, mode, search, selection):
+    return {
+        'order': list(order),
+        'search': search,
+        'selection': selection,
+        'last_date': series.index[-1].strftime('%Y-%m-%d'),
+        'last_value': float(series.iloc[-1]),
+        'n_obs': len(series),
+        'params': [float(p) for p in results.params],
+        'fitted_at': fitted_at.isoformat(),
+        'updated_at': datetime.now().isoformat(),
+        'last_update': mode,
+    }
+
+
+def update_model(ticker, series, order=None, steps=30, holdout=0, search=None, max_workers=None,
+                 refit_every=REFIT_EVERY, drift_threshold=DRIFT_THRESHOLD):
+    # series: the rolling Close used by the forecaster, indexed by date
+    # order=None searches it with select_order(**search) on a full fit; holdout > 0 adds the holdout RMSE
+    started = time.perf_counter()
+    ticker = ticker.upper()
+    series = series.squeeze('columns') if hasattr(series, 'columns') else series
+    now = datetime.now()
+
+    with _lock_for(ticker):
+        model, state = load_model(ticker)
+        mode = 'cached'
+        if state is not None and order is not None and tuple(order) != tuple(state['order']):
+            state = None
+        if state is not None and state.get('search') != search:
+            state = None
+        if state is not None:
+            last_date = np.datetime64(state['last_date'])
+            known = series[series.index <= last_date]
+            # history revised upstream (e.g. dividend adjustment): the stored state no longer applies
+            if len(known) != state['n_obs'] or not np.isclose(known.iloc[-1], state['last_value']):
+                state = None
+
+        if state is None:
+            results, scaler, order, selection = _full_fit(ticker, series, order, holdout, search, max_workers)
+            mode, fitted_at = 'full_fit', now
+        else:
+            results, scaler = model['results'], model['scaler']
+            order, selection = tuple(state['order']), state['selection']
+            fitted_at = datetime.fromisoformat(state['fitted_at'])
+            new = series[series.index > np.datetime64(state['last_date'])]
+
+            if now - fitted_at > refit_every:
+                results, scaler, order, _ = _full_fit(ticker, series, order, holdout)
+                mode, fitted_at = 'full_fit', now
+            elif len(new) > 1:
+                # the checkpoint moves up to the bar before the last
+                scaled_new = scaler.transform(new.values.reshape(-1, 1))
+                extended = results.extend(scaled_new)
+                errors = extended.filter_results.standardized_forecasts_error[0]
+                if np.sqrt(np.nanmean(errors ** 2)) > drift_threshold:
+                    scaled = scaler.transform(series.values[:-1].reshape(-1, 1))
+                    results = _fit(scaled, order, start_params=results.params)
+                    mode = 'warm_refit'
+                else:
+                    results = results.extend(scaled_new[:-1])
+                    mode = 'extended'
+
+        if mode != 'cached':
+            save_model(ticker, {'results': results, 'scaler': scaler},
+                       _state(series.iloc[:-1], order, results, fitted_at, mode, search, selection))
+        checkpoint = series.index[-2] if mode != 'cached' else np.datetime64(state['last_date'])
+        tail = series[series.index > checkpoint]
+        if len(tail):
+            results = results.extend(scaler.transform(tail.values.reshape(-1, 1)))
+
+    predictions = results.get_forecast(steps=steps).predicted_mean
+    forecast = forecast_frame(predictions)
+    forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
+    return {
+        'ticker': ticker,
+        'forecast': forecast,
+        'order': order,
+        'selection': selection,
+        'rmse': _holdout_rmse(results, series, scaler, order, holdout) if holdout else None,
+        'mode': mode,
+        'seconds': time.perf_counter() - started,
+    }
+
@@ -1,17 +1,20 @@
-import yfinance as yf 
-from statsmodels.tsa.stattools import adfuller 
-from sklearn.metrics import mean_squared_error 
-from statsmodels.tsa.arima.model import ARIMA 
 import numpy as np 
-from sklearn.preprocessing import StandardScaler 
 from datetime import datetime, timedelta 
 import pandas as pd  
+from pages.utils.data_store import load_prices
+from pages.utils.profiler import timed
+from pages.utils.stationarity import differencing_order
 
+# statsmodels and scikit-learn take seconds to import, so they are imported by
+# the functions that use them rather than when the module loads
+
+@timed()
 def get_data(ticker):     
-    stock_data = yf.download(ticker, start='2024-01-01')     
+    stock_data = load_prices(ticker, start='2024-01-01')     
     return stock_data[['Close']]  
 
 def stationary_check(close_price):     
+    from statsmodels.tsa.stattools import adfuller
     adf_test = adfuller(close_price)     
     p_value = round(adf_test[1], 3)     
     return p_value  
@@ -20,20 +23,15 @@ def get_rolling_mean(close_price):
     rolling_price = close_price.rolling(window=7).mean().dropna()     
     return rolling_price  
 
-def get_differencing_order(close_price):      
-    p_value = stationary_check(close_price)     
-    d = 0     
-    while True:         
-        if p_value > 0.05:             
-            d += 1             
-            close_price = close_price.diff().dropna()             
-            p_value = stationary_check(close_price)         
-        else:             
-            break     
-    return d
-
-def fit_model(data, differencing_order):     
-    model = ARIMA(data, order=(30, differencing_order, 30))     
+@timed()
+def get_differencing_order(close_price, ticker=None):
+    # one-pass ADF search over d, memoized per ticker and data version
+    return differencing_order(close_price, ticker=ticker)
+
+@timed()
+def fit_model(data, differencing_order, order=None):     
+    from statsmodels.tsa.arima.model import ARIMA
+    model = ARIMA(data, order=order or (30, differencing_order, 30))     
     model_fit = model.fit()      
     
     forecast_steps = 30     
@@ -42,25 +40,116 @@ def fit_model(data, differencing_order):
     predictions = forecast.predicted_mean     
     return predictions  
 
+@timed()
 def evaluate_model(original_price, differencing_order):     
+    from sklearn.metrics import mean_squared_error
     train_data, test_data = original_price[:-30], original_price[-30:]     
     predictions = fit_model(train_data, differencing_order)     
     rmse = np.sqrt(mean_squared_error(test_data, predictions))     
     return round(rmse, 2)  
 
+@timed()
 def scaling(close_price):     
+    from sklearn.preprocessing import StandardScaler
     scaler = StandardScaler()     
     scaled_data = scaler.fit_transform(np.array(close_price).reshape(-1, 1))     
     return scaled_data, scaler  
 
+def forecast_frame(predictions):
+    start_date = datetime.now().strftime('%Y-%m-%d')
+    end_date = (datetime.now() + timedelta(days=len(predictions) - 1)).strftime('%Y-%m-%d')
+    forecast_index = pd.date_range(start=start_date, end=end_date, freq='D')
+    return pd.DataFrame(predictions, index=forecast_index, columns=['Close'])
+
+@timed()
 def get_forecast(original_price, differencing_order):     
     predictions = fit_model(original_price, differencing_order)     
-    start_date = datetime.now().strftime('%Y-%m-%d')     
-    end_date = (datetime.now() + timedelta(days=29)).strftime('%Y-%m-%d')     
-    forecast_index = pd.date_range(start=start_date, end=end_date, freq='D')     
-    forecast_df = pd.DataFrame(predictions, index=forecast_index, columns=['Close'])     
-    return forecast_df  
+    return forecast_frame(predictions)
 
 def inverse_scaling(scaler, scaled_data):     
     close_price = scaler.inverse_transform(np.array(scaled_data).reshape(-1, 1))     
-    return close_price
\ No newline at end of file
+    return close_price
+
+
+class ForecastPipeline:
+    # Fits the model once on the training slice. The holdout RMSE comes from that
+    # fit, and the forward forecast comes from filtering the holdout observations
+    # through the same fitted state space instead of estimating a second model.
+    def __init__(self, data, differencing_order, order=None, holdout=30, steps=30):
+        self.data = data
+        self.order = order or (30, differencing_order, 30)
+        self.holdout = holdout
+        self.steps = steps
+        self.train_results = None
+        self.results = None
+
+    @timed('model_train.ForecastPipeline.fit')
+    def fit(self):
+        from statsmodels.tsa.arima.model import ARIMA
+        self.train_results = ARIMA(self.data[:-self.holdout], order=self.order).fit()
+        self.results = self.train_results.append(self.data[-self.holdout:])
+        return self
+
+    @timed('model_train.ForecastPipeline.evaluate')
+    def evaluate(self, scaler=None):
+        # with the scaler the data was standardised with, the RMSE is in price units
+        from sklearn.metrics import mean_squared_error
+        actual = self.data[-self.holdout:]
+        predictions = self.train_results.get_forecast(steps=self.holdout).predicted_mean
+        if scaler is not None:
+            actual, predictions = inverse_scaling(scaler, actual), inverse_scaling(scaler, predictions)
+        rmse = np.sqrt(mean_squared_error(actual, predictions))
+        return round(rmse, 2)
+
+    @timed('model_train.ForecastPipeline.forecast')
+    def forecast(self):
+        predictions = self.results.get_forecast(steps=self.steps).predicted_mean
+        return forecast_frame(predictions)
+
+
+# Monte Carlo tier: thousands of 30-day paths simulated in one array operation,
+# in milliseconds. Daily log returns of the series are either drawn from a
+# normal distribution with their mean and volatility (GBM), or resampled in
+# blocks of consecutive days from history (block bootstrap, which keeps the
+# autocorrelation the rolling mean introduces). The forecast is the median
+# path with percentile bands.
+MC_PATHS = 10_000
+MC_PERCENTILES = (5, 25, 75, 95)
+MC_BLOCK = 10
+MC_SEED = 0
+
+def _simulated_log_returns(log_returns, n_paths, steps, method, block, rng):
+    if method == 'gbm':
+        mu, sigma = log_returns.mean(), log_returns.std(ddof=1)
+        return rng.normal(mu, sigma, size=(n_paths, steps))
+    if method == 'bootstrap':
+        block = min(block, len(log_returns))
+        n_blocks = -(-steps // block)
+        starts = rng.integers(0, len(log_returns) - block + 1, size=(n_paths, n_blocks))
+        positions = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :steps]
+        return log_returns[positions]
+    raise ValueError(f"Unknown Monte Carlo method: {method}")
+
+@timed()
+def monte_carlo_forecast(close_price, steps=30, method='gbm', n_paths=MC_PATHS, block=MC_BLOCK,
+                         percentiles=MC_PERCENTILES, seed=MC_SEED):
+    # median path in 'Close' plus one column per percentile band ('P5', 'P95', ...)
+    values = np.asarray(close_price, dtype='float64').ravel()
+    log_returns = np.diff(np.log(values))
+    if len(log_returns) < 2:
+        raise ValueError("Not enough history for a Monte Carlo forecast")
+    rng = np.random.default_rng(seed)
+    paths = values[-1] * np.exp(np.cumsum(_simulated_log_returns(log_returns, n_paths, steps, method, block, rng),
+                                          axis=1))
+    bands = np.percentile(paths, (50,) + tuple(percentiles), axis=0)
+    forecast = forecast_frame(bands[0])
+    for p, band in zip(percentiles, bands[1:]):
+        forecast[f'P{p}'] = band
+    return forecast
+
+@timed()
+def evaluate_monte_carlo(close_price, method='gbm', holdout=30, **kwargs):
+    # holdout RMSE of the median path, in price units
+    values = np.asarray(close_price, dtype='float64').ravel()
+    median = monte_carlo_forecast(values[:-holdout], steps=holdout, method=method, **kwargs)['Close'].values
+    return round(float(np.sqrt(np.mean((values[-holdout:] - median) ** 2))), 2)
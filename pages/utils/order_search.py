@@ -0,0 +1,115 @@
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pages.utils.data_store import fingerprint
+from pages.utils.json_cache import JsonCache
+from pages.utils.profiler import timed
+
+# ARIMA order selection by information criterion.
+# Candidates are visited in waves of increasing p + q. A fitted candidate whose
+# score is worse than the best so far by more than `margin` is dominated, and
+# the larger orders that only extend dominated candidates are never fitted.
+# The search stops once `patience` waves in a row fail to improve the best score.
+# Selections are memoized per ticker and data fingerprint (see json_cache).
+CACHE_DIR = os.environ.get("EQUINOVA_ORDER_CACHE", os.path.join(".equinova", "arima_orders"))
+
+_cache = JsonCache(CACHE_DIR)
+
+
+def score_order(data, order, criterion='aic', maxiter=50):
+    from statsmodels.tsa.arima.model import ARIMA
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            result = ARIMA(data, order=order).fit(method_kwargs={'maxiter': maxiter})
+        score = float(getattr(result, criterion))
+        if not np.isfinite(score):
+            score = float('inf')
+    except Exception:
+        score = float('inf')
+    return order, score, time.perf_counter() - start
+
+
+def _waves(max_p, max_q, d_values):
+    for total in range(max_p + max_q + 1):
+        yield [(p, d, total - p) for d in d_values
+               for p in range(max(0, total - max_q), min(total, max_p) + 1)]
+
+
+def _parents(order):
+    p, d, q = order
+    return [o for o in ((p - 1, d, q), (p, d, q - 1)) if o[0] >= 0 and o[2] >= 0]
+
+
+@timed()
+def select_order(data, differencing_order, ticker=None, max_p=5, max_q=5, criterion='aic',
+                 margin=10.0, patience=2, max_workers=None, maxiter=50, d_values=None):
+    started = time.perf_counter()
+    d_values = d_values or [differencing_order]
+    key = None
+    if ticker is not None:
+        key = f"{ticker}|{fingerprint(data)}|{criterion}|{max_p}|{max_q}|{','.join(map(str, d_values))}"
+        cached = _cache.get(key, ticker)
+        if cached is not None:
+            return dict(cached, order=tuple(cached['order']), cached=True,
+                        elapsed=time.perf_counter() - started)
+
+    max_workers = max_workers or min(os.cpu_count() or 1, 8)
+    scores = {}
+    fit_seconds = 0.0
+    best = float('inf')
+    stale_waves = 0
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        for wave in _waves(max_p, max_q, d_values):
+            candidates = []
+            for order in wave:
+                parents = _parents(order)
+                if not parents or any(scores.get(o, float('inf')) <= best + margin for o in parents):
+                    candidates.append(order)
+            if not candidates:
+                break
+
+            if executor is None:
+                results = [score_order(data, o, criterion, maxiter) for o in candidates]
+            else:
+                results = list(executor.map(score_order, [data] * len(candidates), candidates,
+                                            [criterion] * len(candidates), [maxiter] * len(candidates)))
+
+            wave_best = float('inf')
+            for order, score, seconds in results:
+                scores[order] = score
+                fit_seconds += seconds
+                wave_best = min(wave_best, score)
+
+            if wave_best < best - 1e-6:
+                best = wave_best
+                stale_waves = 0
+            else:
+                stale_waves += 1
+                if stale_waves >= patience:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if not np.isfinite(best):
+        raise ValueError("No candidate ARIMA order could be fitted")
+    order = min(scores, key=scores.get)
+    selection = {
+        'order': order,
+        'score': round(scores[order], 3),
+        'criterion': criterion,
+        'n_fitted': len(scores),
+        'n_skipped': (max_p + 1) * (max_q + 1) * len(d_values) - len(scores),
+        'fit_seconds': round(fit_seconds, 3),
+        'search_seconds': round(time.perf_counter() - started, 3),
+    }
+    if key is not None:
+        _cache.put(key, dict(selection, order=list(order)), ticker)
+    return dict(selection, cached=False, elapsed=time.perf_counter() - started)
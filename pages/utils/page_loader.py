@@ -0,0 +1,45 @@
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Concurrent data loading for the pages. A page declares everything it needs up
+# front; the fetches start immediately on a shared, bounded thread pool and the
+# page renders each section as soon as its own data is in, so the wait is the
+# slowest fetch rather than the sum of all of them.
+# Fetch functions run outside the Streamlit script thread and must not call st.*.
+# Pages with a single data dependency (Price Forecast, Trade Alert) call their
+# loader directly: with nothing to overlap, the pool would only add a hand-off.
+MAX_WORKERS = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='page-loader')
+        return _pool
+
+
+class PageLoader:
+    def __init__(self):
+        self._futures = {}
+
+    def fetch(self, name, fn, *args, **kwargs):
+        # the fetch runs in a copy of the page's context so profiler spans land on the page run
+        self._futures[name] = _executor().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        return self
+
+    def result(self, name, timeout=None):
+        # the fetched value; re-raises the exception of a failed fetch
+        return self._futures[name].result(timeout)
+
+    def as_completed(self, names=None):
+        # yields the names of the fetches (all by default) in the order they finish
+        pending = {self._futures[name]: name for name in (names or self._futures)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in [f for f in pending if f in done]:
+                yield pending.pop(future)
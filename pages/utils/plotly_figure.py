@@ -1,9 +1,13 @@
 import plotly.graph_objects as go
-import pandas as pd
-import dateutil.relativedelta as relativedelta
-import ta
-import datetime
+import numpy as np
+from pages.utils.indicators import compute_indicators
+from pages.utils.windowing import as_dated, period_start, period_window
+from pages.utils.downsample import (
+    CHART_WIDTH, WEBGL_THRESHOLD, point_budget, candle_budget, decimate, ohlc_buckets
+)
+from pages.utils.profiler import timed
 
+@timed()
 def plotly_table(dataframe):
     fig = go.Figure(data=[go.Table(
         header=dict(
@@ -31,41 +35,35 @@ def plotly_table(dataframe):
 
     return fig
 
+@timed()
 def filter_data(dataframe, num_period):
-    if 'Date' not in dataframe.columns:
-        dataframe = dataframe.reset_index()
+    # kept for callers that expect 'Date' as a column; chart builders use period_window directly
+    return period_window(as_dated(dataframe), num_period).reset_index()
 
-    if num_period == '1mo':
-        date = dataframe['Date'].iloc[-1] + relativedelta.relativedelta(months=-1)
-    elif num_period == '5d':
-        date = dataframe['Date'].iloc[-1] + relativedelta.relativedelta(days=-5)
-    elif num_period == '6mo':
-        date = dataframe['Date'].iloc[-1] + relativedelta.relativedelta(months=-6)
-    elif num_period == '1y':
-        date = dataframe['Date'].iloc[-1] + relativedelta.relativedelta(years=-1)
-    elif num_period == '5y':
-        date = dataframe['Date'].iloc[-1] + relativedelta.relativedelta(years=-5)
-    else:
-        date = dataframe['Date'].iloc[0]
+def indicator_window(dataframe, num_period, ticker=None):
+    # visible rows plus their indicators; the caller's frame is left untouched
+    dataframe = as_dated(dataframe)
+    start = period_start(dataframe, num_period)
+    indicators = compute_indicators(dataframe['Close'], ticker=ticker, start=start)
+    return dataframe.iloc[start:].assign(**{col: indicators[col].values for col in indicators.columns})
 
-    return dataframe[dataframe['Date'] > date]
+def line_trace(series, name, line, width=CHART_WIDTH):
+    # width: chart width in pixels used as the point budget; None draws every point
+    if width:
+        series = decimate(series, point_budget(width))
+    scatter = go.Scattergl if len(series) > WEBGL_THRESHOLD else go.Scatter
+    return scatter(x=series.index, y=series.values, mode='lines', name=name, line=line)
 
-def close_chart(dataframe, num_period=False):
+@timed()
+def close_chart(dataframe, num_period=False, width=CHART_WIDTH):
+    dataframe = as_dated(dataframe)
     if num_period:
-        dataframe = filter_data(dataframe, num_period)
+        dataframe = period_window(dataframe, num_period)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Open'],
-                             mode='lines', name='Open',
-                             line=dict(width=2, color='#1E90FF')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Close'],
-                             mode='lines', name='Close',
-                             line=dict(width=2, color='Pink')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['High'],
-                             mode='lines', name='High',
-                             line=dict(width=2, color='#FF8C00')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Low'],
-                             mode='lines', name='Low',
-                             line=dict(width=2, color='#DC143C')))
+    fig.add_trace(line_trace(dataframe['Open'], 'Open', dict(width=2, color='#1E90FF'), width))
+    fig.add_trace(line_trace(dataframe['Close'], 'Close', dict(width=2, color='Pink'), width))
+    fig.add_trace(line_trace(dataframe['High'], 'High', dict(width=2, color='#FF8C00'), width))
+    fig.add_trace(line_trace(dataframe['Low'], 'Low', dict(width=2, color='#DC143C'), width))
     fig.update_layout(height=500, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
                       font=dict(color='white', family='Times New Roman', size=13),
                       legend=dict(yanchor="top", xanchor="right", font=dict(color='white')),
@@ -73,11 +71,14 @@ def close_chart(dataframe, num_period=False):
                       yaxis=dict(gridcolor='#444'))
     return fig
 
-def candlestick(dataframe, num_period):
-    dataframe = filter_data(dataframe, num_period)
+@timed()
+def candlestick(dataframe, num_period, width=CHART_WIDTH):
+    dataframe = period_window(as_dated(dataframe), num_period)
+    if width:
+        dataframe = ohlc_buckets(dataframe, candle_budget(width))
     fig = go.Figure(data=[
         go.Candlestick(
-            x=dataframe['Date'],
+            x=dataframe.index,
             open=dataframe['Open'],
             high=dataframe['High'],
             low=dataframe['Low'],
@@ -96,15 +97,15 @@ def candlestick(dataframe, num_period):
                       title_font=dict(color='white'), height=500)
     return fig
 
-def RSI(dataframe, num_period):
-    dataframe['RSI'] = ta.momentum.RSIIndicator(dataframe['Close']).rsi()
-    dataframe = filter_data(dataframe, num_period)
+@timed()
+def RSI(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe = indicator_window(dataframe, num_period, ticker)
+    ends = dataframe.index[[0, -1]] if len(dataframe) else []
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['RSI'],
-                             mode='lines', name='RSI', line=dict(width=2, color='#00BFFF')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=[70]*len(dataframe),
+    fig.add_trace(line_trace(dataframe['RSI'], 'RSI', dict(width=2, color='#00BFFF'), width))
+    fig.add_trace(go.Scatter(x=ends, y=[70]*len(ends),
                              mode='lines', name='Overbought', line=dict(dash='dash', color='red')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=[30]*len(dataframe),
+    fig.add_trace(go.Scatter(x=ends, y=[30]*len(ends),
                              mode='lines', name='Oversold', line=dict(dash='dash', color='lime')))
     fig.update_layout(height=250, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
                       font=dict(color='white', family='Times New Roman', size=13),
@@ -113,14 +114,12 @@ def RSI(dataframe, num_period):
                       legend=dict(orientation="h", font=dict(color='white'), bgcolor='#2a2a2a', bordercolor='white', borderwidth=1))
     return fig
 
-def Moving_average(dataframe, num_period):
-    dataframe['SMA_50'] = ta.trend.SMAIndicator(dataframe['Close'], 50).sma_indicator()
-    dataframe = filter_data(dataframe, num_period)
+@timed()
+def Moving_average(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe = indicator_window(dataframe, num_period, ticker)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Close'],
-                             mode='lines', name='Close', line=dict(width=2, color='white')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['SMA_50'],
-                             mode='lines', name='SMA_50', line=dict(width=2, color='orange')))
+    fig.add_trace(line_trace(dataframe['Close'], 'Close', dict(width=2, color='white'), width))
+    fig.add_trace(line_trace(dataframe['SMA_50'], 'SMA_50', dict(width=2, color='orange'), width))
     fig.update_layout(height=500, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
                       font=dict(color='white', family='Times New Roman', size=13),
                       legend=dict(yanchor="top", xanchor="right", font=dict(color='white'), bgcolor='#2a2a2a', bordercolor='white', borderwidth=1),
@@ -128,19 +127,18 @@ def Moving_average(dataframe, num_period):
                       yaxis=dict(gridcolor='#444'))
     return fig
 
-def MACD(dataframe, num_period):
-    macd_indicator = ta.trend.MACD(dataframe['Close'])
-    dataframe['MACD'] = macd_indicator.macd()
-    dataframe['Signal'] = macd_indicator.macd_signal()
-    dataframe['Histogram'] = macd_indicator.macd_diff()
-    dataframe = filter_data(dataframe, num_period)
+@timed()
+def MACD(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe = indicator_window(dataframe, num_period, ticker)
+    histogram = dataframe['Histogram']
+    if width:
+        # bars keep the extremes of each bucket rather than the line shape
+        histogram = decimate(histogram, point_budget(width), method='minmax')
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['MACD'],
-                             mode='lines', name='MACD', line=dict(width=2, color='#FFBF00')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Signal'],
-                             mode='lines', name='Signal', line=dict(width=2, color='#00CED1', dash='dash')))
-    fig.add_trace(go.Bar(x=dataframe['Date'], y=dataframe['Histogram'], name='Histogram',
-                         marker_color=['#00FA9A' if val >= 0 else '#FF4500' for val in dataframe['Histogram']]))
+    fig.add_trace(line_trace(dataframe['MACD'], 'MACD', dict(width=2, color='#FFBF00'), width))
+    fig.add_trace(line_trace(dataframe['Signal'], 'Signal', dict(width=2, color='#00CED1', dash='dash'), width))
+    fig.add_trace(go.Bar(x=histogram.index, y=histogram.values, name='Histogram',
+                         marker_color=np.where(histogram.values >= 0, '#00FA9A', '#FF4500')))
     fig.update_layout(height=250, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
                       font=dict(color='white', family='Times New Roman', size=13),
                       xaxis=dict(gridcolor="#333", tickfont=dict(color='white')),
@@ -148,10 +146,25 @@ def MACD(dataframe, num_period):
                       legend=dict(orientation="h", font=dict(color='white'), bgcolor='#2a2a2a', bordercolor='white', borderwidth=1))
     return fig
 
+def fan_bands(columns):
+    # (lower, upper) percentile column pairs, outermost first: P5/P95, then P25/P75
+    levels = sorted(int(c[1:]) for c in columns if isinstance(c, str) and c[:1] == 'P' and c[1:].isdigit())
+    return [(f'P{lo}', f'P{hi}') for lo, hi in zip(levels, reversed(levels)) if lo < hi]
+
+@timed()
 def Moving_average_forecast(forecast):
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=forecast.index[:-30], y=forecast['Close'].iloc[:-30],
                              mode='lines', name='Historical Close', line=dict(width=2, color='white')))
+    # Monte Carlo forecasts carry percentile columns, drawn as a fan under the median
+    future = forecast.iloc[-30:]
+    for i, (lower, upper) in enumerate(fan_bands(forecast.columns)):
+        name = f"{lower[1:]}–{upper[1:]}th percentile"
+        fill = f"rgba(0, 191, 255, {0.15 + 0.15 * i:.2f})"
+        fig.add_trace(go.Scatter(x=future.index, y=future[upper], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip', legendgroup=name))
+        fig.add_trace(go.Scatter(x=future.index, y=future[lower], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=fill, name=name, legendgroup=name))
     fig.add_trace(go.Scatter(x=forecast.index[-30:], y=forecast['Close'].iloc[-30:],
                              mode='lines', name='Forecasted Close', line=dict(width=2, color='deepskyblue')))
     fig.update_layout(height=500, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
@@ -160,3 +173,18 @@ def Moving_average_forecast(forecast):
                       yaxis=dict(gridcolor='#444'),
                       legend=dict(yanchor="top", xanchor="right", font=dict(color='white'), bgcolor='#2a2a2a', bordercolor='white', borderwidth=1))
     return fig
+
+@timed()
+def backtest_chart(by_horizon):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=by_horizon.index, y=by_horizon['RMSE'], mode='lines+markers', name='RMSE',
+                             line=dict(width=2, color='deepskyblue')))
+    fig.add_trace(go.Scatter(x=by_horizon.index, y=by_horizon['MAPE'], mode='lines+markers', name='MAPE (%)',
+                             line=dict(width=2, color='orange', dash='dash'), yaxis='y2'))
+    fig.update_layout(height=350, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e',
+                      font=dict(color='white', family='Times New Roman', size=13),
+                      xaxis=dict(title='Days ahead', gridcolor='#444'),
+                      yaxis=dict(title='RMSE ($)', gridcolor='#444'),
+                      yaxis2=dict(title='MAPE (%)', overlaying='y', side='right', showgrid=False),
+                      legend=dict(orientation="h", font=dict(color='white'), bgcolor='#2a2a2a', bordercolor='white', borderwidth=1))
+    return fig
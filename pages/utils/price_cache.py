@@ -0,0 +1,155 @@
+import os
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# One read-only copy of each ticker's bars for every session of the server.
+# A partition version is written once as a set of .npy files (the index and
+# one file per column) and memory-mapped back read-only, so the frame handed
+# out is a set of zero-copy views on pages the OS shares between all processes
+# that map the same file (set EQUINOVA_PRICE_CACHE_DIR to a /dev/shm path to
+# keep them in shared memory). Sessions slice these frames, which only creates
+# more views. Mapped versions are evicted least recently used first once the
+# mapped bytes exceed EQUINOVA_PRICE_CACHE_BYTES, and an evicted key's files are
+# deleted with it. The directory is held to the same budget when a version is
+# written, oldest first, which also clears entries left by processes that have
+# exited (with /dev/shm these files are RAM).
+CACHE_DIR = os.environ.get("EQUINOVA_PRICE_CACHE_DIR", os.path.join(".equinova", "price_cache"))
+BYTE_BUDGET = int(os.environ.get("EQUINOVA_PRICE_CACHE_BYTES", 256 * 2 ** 20))
+
+
+def _frame_bytes(frame):
+    return int(frame.index.nbytes + sum(frame[c].values.nbytes for c in frame.columns))
+
+
+class PriceCache:
+    def __init__(self, directory=CACHE_DIR, budget=BYTE_BUDGET):
+        self.directory = directory
+        self.budget = budget
+        self._entries = OrderedDict()  # key -> (version, frame, extra, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def _entry_dir(self, key):
+        name = hashlib.sha1('|'.join(map(str, key)).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, name)
+
+    def _map(self, path, columns):
+        # plain ndarray views of the mappings: slicing a np.memmap pays for subclass bookkeeping every time
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r').view(np.ndarray)
+        index = pd.DatetimeIndex(load('index'), name='Date')
+        data = {c: load(c) for c in columns}
+        # one block per column, each a view on its mapping
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def _write(self, path, frame):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        np.save(os.path.join(tmp_path, 'index.npy'), frame.index.values.astype('datetime64[ns]'))
+        for c in frame.columns:
+            np.save(os.path.join(tmp_path, f'{c}.npy'), np.ascontiguousarray(frame[c].values))
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # another process published this version first, map theirs
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _remove(self, key):
+        # mappings other processes still hold stay valid until they drop them
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _prune_directory(self, keep):
+        # oldest written versions first, until the files (`keep`, the one just written, included) fit the budget
+        def size(path):
+            return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+        versions = []
+        total = size(keep)
+        for name in os.listdir(self.directory):
+            root = os.path.join(self.directory, name)
+            for version in os.listdir(root) if os.path.isdir(root) else []:
+                path = os.path.join(root, version)
+                if version.endswith('.tmp') or path == keep:
+                    continue
+                try:
+                    versions.append((os.path.getmtime(path), size(path), path))
+                except OSError:
+                    pass
+        total += sum(nbytes for _, nbytes, _ in versions)
+        for _, nbytes, path in sorted(versions):
+            if total <= self.budget:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                # the key has other versions, or another process is writing one
+                pass
+            total -= nbytes
+
+    def _share(self, key, version, frame):
+        if frame.empty or frame.columns.has_duplicates:
+            return frame
+        root = self._entry_dir(key)
+        path = os.path.join(root, str(version))
+        if not os.path.isdir(path):
+            self._write(path, frame)
+            self._prune_directory(keep=path)
+        # older versions are removed; mappings other processes still hold stay valid until they drop them
+        for name in os.listdir(root):
+            if name != str(version) and not name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        return self._map(path, list(frame.columns))
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, version, frame, extra=None):
+        # returns the shared read-only frame to use in place of the one passed in
+        try:
+            frame = self._share(key, version, frame)
+        except OSError:
+            # no usable cache directory, keep the frame in process memory instead
+            pass
+        nbytes = _frame_bytes(frame)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[3]
+            self._entries[key] = (version, frame, extra, nbytes)
+            self.nbytes += nbytes
+            evicted_keys = []
+            while self.nbytes > self.budget and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[3]
+                self.evictions += 1
+                evicted_keys.append(evicted_key)
+        for evicted_key in evicted_keys:
+            self._remove(evicted_key)
+        return frame
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.nbytes = 0
+            elif key in self._entries:
+                self.nbytes -= self._entries.pop(key)[3]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.nbytes, 'budget': self.budget,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import bisect
+import threading
+import functools
+import contextvars
+
+# Timing spans for the hot paths (data fetch, differencing tests, ARIMA fits,
+# indicators, windowing, figure builders).
+#
+# Profiling is off unless EQUINOVA_PROFILE=1 (or enable() is called); a disabled
+# span is a shared no-op object and a disabled @timed function costs one flag
+# check. When enabled, every span feeds a process-wide latency histogram per
+# stage, and spans opened during a page run are also kept on that run so the
+# debug panel can draw a waterfall of the last rerun.
+# Histograms are exported to EQUINOVA_PROFILE_OUTPUT: Prometheus text format for
+# a .prom file, JSON otherwise.
+OUTPUT = os.environ.get("EQUINOVA_PROFILE_OUTPUT")
+# histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_enabled = os.environ.get("EQUINOVA_PROFILE", "").lower() in ("1", "true", "yes")
+_histograms = {}
+_lock = threading.Lock()
+_current_run = contextvars.ContextVar('equinova_profile_run', default=None)
+_depth = contextvars.ContextVar('equinova_profile_depth', default=0)
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _observe(name, seconds):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = {'counts': [0] * (len(BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+        hist['counts'][bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist['sum'] += seconds
+        hist['count'] += 1
+
+
+class _Span:
+    __slots__ = ('name', 'start', 'depth', 'token')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = _depth.get()
+        self.token = _depth.set(self.depth + 1)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _depth.reset(self.token)
+        _observe(self.name, end - self.start)
+        run = _current_run.get()
+        if run is not None:
+            run.add(self.name, self.start, end, self.depth)
+        return False
+
+
+def span(name):
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name=None):
+    # decorator form of span(); the stage name defaults to module.function
+    def decorator(fn):
+        stage = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Run:
+    # the spans of one page run, with offsets relative to the start of the run
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, stage, start, end, depth):
+        with self._lock:
+            self.spans.append({
+                'stage': stage, 'thread': threading.current_thread().name, 'depth': depth,
+                'start': start - self.started, 'seconds': end - start,
+            })
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def start_run(name):
+    # called at the top of a page; spans from threads started with the run's context are included
+    if not _enabled:
+        return None
+    run = Run(name)
+    _current_run.set(run)
+    return run
+
+
+def histograms():
+    with _lock:
+        return {name: {'counts': list(h['counts']), 'sum': h['sum'], 'count': h['count']}
+                for name, h in _histograms.items()}
+
+
+def _prometheus_text(snapshot):
+    lines = ['# HELP equinova_stage_seconds Latency of instrumented stages.',
+             '# TYPE equinova_stage_seconds histogram']
+    for name, hist in sorted(snapshot.items()):
+        cumulative = 0
+        for bound, count in zip(list(BUCKETS) + ['+Inf'], hist['counts']):
+            cumulative += count
+            lines.append(f'equinova_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'equinova_stage_seconds_sum{{stage="{name}"}} {hist["sum"]:.6f}')
+        lines.append(f'equinova_stage_seconds_count{{stage="{name}"}} {hist["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path=None):
+    path = path or OUTPUT
+    if not path:
+        return None
+    snapshot = histograms()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        if path.endswith('.prom'):
+            f.write(_prometheus_text(snapshot))
+        else:
+            json.dump({'buckets': list(BUCKETS), 'stages': snapshot}, f, indent=1)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def render_panel(run):
+    # sidebar waterfall of the current rerun; a no-op unless profiling is enabled
+    if run is None:
+        return
+    import streamlit as st
+    import plotly.graph_objects as go
+
+    export()
+    spans = sorted(run.spans, key=lambda s: s['start'])
+    with st.sidebar.expander(f"⏱️ Profiler: {run.name} ({run.total() * 1000:.0f} ms)"):
+        if not spans:
+            st.caption("No instrumented stages ran.")
+            return
+        labels = [f"{'· ' * s['depth']}{s['stage']}" for s in spans]
+        rows = list(range(len(spans)))
+        fig = go.Figure(go.Bar(
+            y=rows, x=[s['seconds'] * 1000 for s in spans], base=[s['start'] * 1000 for s in spans],
+            orientation='h', marker_color='#9acaa6',
+            hovertext=[f"{s['thread']}: {s['seconds'] * 1000:.1f} ms" for s in spans], hoverinfo='text',
+        ))
+        fig.update_layout(height=max(200, 22 * len(spans)), margin=dict(l=0, r=0, t=10, b=0),
+                          xaxis_title='ms since rerun start',
+                          yaxis=dict(tickvals=rows, ticktext=labels, autorange='reversed'))
+        st.plotly_chart(fig, use_container_width=True)
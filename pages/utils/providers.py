@@ -0,0 +1,390 @@
+import os
+import json
+import zlib
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Market data providers. Every backend implements history() (shaped like
+# yf.Ticker.history) and info() (shaped like yf.Ticker.info); download() is
+# derived from history() and reproduces the layout of yf.download.
+#
+# The active provider is picked with EQUINOVA_PROVIDER:
+#   yahoo      live Yahoo Finance (default)
+#   record     live Yahoo Finance, every response saved to EQUINOVA_REPLAY_DIR
+#   replay     serves the responses saved by "record", no network
+#   synthetic  generated market, seeded by EQUINOVA_SYNTHETIC_SEED
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+REPLAY_DIR = os.environ.get("EQUINOVA_REPLAY_DIR", os.path.join(".equinova", "recordings"))
+
+INTERVAL_MINUTES = {'1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60}
+PERIOD_OFFSETS = {
+    'd': lambda n: pd.DateOffset(days=n), 'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n), 'y': lambda n: pd.DateOffset(years=n),
+}
+EXCHANGE_TZ = 'America/New_York'
+
+
+def _empty_history():
+    frame = pd.DataFrame(columns=PRICE_COLUMNS, dtype='float64')
+    frame.index = pd.DatetimeIndex([], name='Date', tz=EXCHANGE_TZ)
+    return frame
+
+
+def _period_start(period, end):
+    if period is None or period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(end.year, 1, 1, tz=end.tz)
+    for suffix, offset in PERIOD_OFFSETS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end - offset(int(period[:-len(suffix)]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _session_days(origin, n_sessions):
+    first = np.busday_offset(np.datetime64(origin.date()), 0, roll='forward')
+    return np.busday_offset(first, np.arange(n_sessions)).astype('datetime64[ns]')
+
+
+def _as_timestamp(value, tz):
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    return value.tz_localize(tz) if value.tz is None else value.tz_convert(tz)
+
+
+class PriceProvider:
+    name = 'base'
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d',
+                auto_adjust=True, actions=True):
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def download(self, tickers, start=None, end=None, period=None, interval='1d',
+                 group_by='column', auto_adjust=True, multi_level_index=True):
+        if isinstance(tickers, str):
+            tickers = tickers.replace(',', ' ').split()
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        if start is None and period is None:
+            period = 'max'
+
+        intraday = interval in INTERVAL_MINUTES
+        frames = {}
+        for ticker in tickers:
+            try:
+                frame = self.history(ticker, start=start, end=end, period=period, interval=interval,
+                                     auto_adjust=auto_adjust, actions=False)
+            except Exception:
+                # yf.download never raises for a single bad symbol, it leaves its columns empty
+                frame = _empty_history()
+            if not intraday and frame.index.tz is not None:
+                frame.index = frame.index.tz_localize(None)
+            frames[ticker] = frame
+
+        data = pd.concat(frames.values(), axis=1, sort=True, keys=frames.keys(), names=['Ticker', 'Price'])
+        data.index = pd.to_datetime(data.index, utc=intraday)
+        data.index.name = 'Datetime' if intraday else 'Date'
+        if group_by == 'column':
+            data.columns = data.columns.swaplevel(0, 1)
+            data = data.sort_index(level=0, axis=1)
+        if not multi_level_index and len(tickers) == 1:
+            data = data.droplevel(0 if group_by == 'ticker' else 1, axis=1).rename_axis(None, axis=1)
+        return data
+
+
+class YahooProvider(PriceProvider):
+    name = 'yahoo'
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d',
+                auto_adjust=True, actions=True):
+        import yfinance as yf
+        from yfinance.exceptions import YFPricesMissingError
+
+        if start is None and period is None:
+            period = 'max'
+        try:
+            return yf.Ticker(ticker).history(start=start, end=end, period=period, interval=interval,
+                                             auto_adjust=auto_adjust, actions=actions, raise_errors=True)
+        except YFPricesMissingError:
+            # Yahoo reports "no data" for ranges without sessions (weekends, holidays)
+            return _empty_history()
+
+    def info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+    def download(self, tickers, start=None, end=None, period=None, interval='1d',
+                 group_by='column', auto_adjust=True, multi_level_index=True):
+        import yfinance as yf
+        if start is None and period is None:
+            period = 'max'
+        return yf.download(tickers, start=start, end=end, period=period, interval=interval,
+                           group_by=group_by, auto_adjust=auto_adjust,
+                           multi_level_index=multi_level_index, progress=False)
+
+
+class RecordingProvider(PriceProvider):
+    def __init__(self, inner, directory=REPLAY_DIR):
+        self.inner = inner
+        self.directory = directory
+        self.name = inner.name
+        self._lock = threading.Lock()
+
+    def _index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    def _add_entry(self, entry):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            index = []
+            if os.path.exists(self._index_path()):
+                with open(self._index_path()) as f:
+                    index = json.load(f)
+            index.append(entry)
+            with open(self._index_path() + '.tmp', 'w') as f:
+                json.dump(index, f, indent=1)
+            os.replace(self._index_path() + '.tmp', self._index_path())
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d',
+                auto_adjust=True, actions=True):
+        frame = self.inner.history(ticker, start=start, end=end, period=period, interval=interval,
+                                   auto_adjust=auto_adjust, actions=actions)
+        file_name = f"history-{ticker}-{interval}-{datetime.now():%Y%m%d%H%M%S%f}.parquet"
+        os.makedirs(self.directory, exist_ok=True)
+        frame.to_parquet(os.path.join(self.directory, file_name))
+        self._add_entry({'kind': 'history', 'ticker': ticker.upper(), 'interval': interval,
+                         'auto_adjust': bool(auto_adjust), 'file': file_name})
+        return frame
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        file_name = f"info-{ticker}-{datetime.now():%Y%m%d%H%M%S%f}.json"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, file_name), 'w') as f:
+            json.dump(info, f, default=str)
+        self._add_entry({'kind': 'info', 'ticker': ticker.upper(), 'file': file_name})
+        return info
+
+
+class ReplayProvider(PriceProvider):
+    name = 'replay'
+
+    def __init__(self, directory=REPLAY_DIR):
+        self.directory = directory
+        self._frames = {}
+        with open(os.path.join(directory, 'index.json')) as f:
+            self._index = json.load(f)
+
+    def _recorded(self, ticker, interval, auto_adjust):
+        key = (ticker, interval, bool(auto_adjust))
+        if key not in self._frames:
+            files = [e['file'] for e in self._index
+                     if e['kind'] == 'history' and e['ticker'] == ticker
+                     and e['interval'] == interval and e['auto_adjust'] == bool(auto_adjust)]
+            if not files:
+                raise LookupError(f"No recorded {interval} history for {ticker}")
+            # later recordings win where they overlap
+            frames = [pd.read_parquet(os.path.join(self.directory, f)) for f in files]
+            frame = pd.concat([f for f in frames if not f.empty] or [frames[-1]])
+            self._frames[key] = frame[~frame.index.duplicated(keep='last')].sort_index()
+        return self._frames[key]
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d',
+                auto_adjust=True, actions=True):
+        frame = self._recorded(ticker.upper(), interval, auto_adjust)
+        if frame.empty:
+            return frame
+        tz = frame.index.tz
+        end = _as_timestamp(end, tz)
+        if start is None and period not in (None, 'max'):
+            start = _period_start(period, end if end is not None else frame.index[-1])
+        start = _as_timestamp(start, tz)
+
+        lo = 0 if start is None else frame.index.searchsorted(start, side='left')
+        hi = len(frame) if end is None else frame.index.searchsorted(end, side='left')
+        frame = frame.iloc[lo:hi]
+        return frame if actions else frame.drop(columns=['Dividends', 'Stock Splits'], errors='ignore')
+
+    def info(self, ticker):
+        files = [e['file'] for e in self._index if e['kind'] == 'info' and e['ticker'] == ticker.upper()]
+        if not files:
+            raise LookupError(f"No recorded info for {ticker}")
+        with open(os.path.join(self.directory, files[-1])) as f:
+            return json.load(f)
+
+
+class SyntheticProvider(PriceProvider):
+    # Geometric Brownian motion with Poisson jumps, overnight gaps and stock
+    # splits. Every (seed, ticker, interval) maps to one fixed path that starts
+    # at `origin`, so repeated requests always return the same bars.
+    name = 'synthetic'
+
+    def __init__(self, seed=0, origin='2000-01-03', intraday_origin='2024-01-02',
+                 jump_rate=4.0, jump_scale=0.04, gap_prob=0.02, gap_scale=0.05,
+                 split_rate=0.1, block_size=4096):
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.intraday_origin = pd.Timestamp(intraday_origin)
+        self.jump_rate = jump_rate
+        self.jump_scale = jump_scale
+        self.gap_prob = gap_prob
+        self.gap_scale = gap_scale
+        self.split_rate = split_rate
+        self.block_size = block_size
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, *key):
+        return np.random.default_rng([self.seed] + [zlib.crc32(str(k).encode()) for k in key])
+
+    def _params(self, ticker):
+        rng = self._rng(ticker, 'params')
+        return {
+            'price': rng.uniform(10, 500),
+            'mu': rng.uniform(0.02, 0.15),
+            'sigma': rng.uniform(0.15, 0.45),
+            'volume': rng.uniform(5e5, 5e7),
+        }
+
+    def _index(self, interval, n_bars):
+        if interval == '1d':
+            return pd.DatetimeIndex(_session_days(self.origin, n_bars), name='Date').tz_localize(EXCHANGE_TZ)
+        step = INTERVAL_MINUTES[interval]
+        per_day = -(-390 // step)
+        days = _session_days(self.intraday_origin, -(-n_bars // per_day))
+        offsets = (570 + step * np.arange(per_day)).astype('timedelta64[m]').astype('timedelta64[ns]')
+        stamps = (days[:, None] + offsets[None, :]).ravel()[:n_bars]
+        return pd.DatetimeIndex(stamps, name='Datetime').tz_localize(EXCHANGE_TZ)
+
+    def _block(self, ticker, interval, block):
+        p = self._params(ticker)
+        rng = self._rng(ticker, interval, block)
+        n = self.block_size
+        bars_per_year = 252 if interval == '1d' else 252 * -(-390 // INTERVAL_MINUTES[interval])
+        per_day = 1 if interval == '1d' else bars_per_year // 252
+        dt = 1.0 / bars_per_year
+        session_open = (block * n + np.arange(n)) % per_day == 0
+
+        intraday = (p['mu'] - 0.5 * p['sigma'] ** 2) * dt + p['sigma'] * np.sqrt(dt) * rng.standard_normal(n)
+        jumps = rng.poisson(self.jump_rate * dt, n) * rng.normal(0, self.jump_scale, n)
+        gaps = np.where(session_open & (rng.random(n) < self.gap_prob), rng.normal(0, self.gap_scale, n), 0.0)
+        splits = np.where(session_open & (rng.random(n) < self.split_rate / 252),
+                          rng.choice([2.0, 3.0, 4.0, 0.5], n, p=[0.6, 0.2, 0.1, 0.1]), 1.0)
+        wick = np.abs(rng.standard_normal((2, n))) * p['sigma'] * np.sqrt(dt) * 0.5
+        volume = p['volume'] / per_day * rng.lognormal(0, 0.4, n)
+        return gaps, intraday + jumps, splits, wick, volume
+
+    def _path(self, ticker, interval, n_bars):
+        key = (ticker, interval)
+        with self._lock:
+            blocks = self._paths.get(key, [])
+            while len(blocks) * self.block_size < n_bars:
+                blocks.append(self._block(ticker, interval, len(blocks)))
+            self._paths[key] = blocks
+
+        gaps, moves, splits, volume = (np.concatenate([b[i] for b in blocks])[:n_bars] for i in (0, 1, 2, 4))
+        wick = np.concatenate([b[3] for b in blocks], axis=1)[:, :n_bars]
+        log_close = np.log(self._params(ticker)['price']) + np.cumsum(gaps + moves)
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - moves)
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        return open_, high, low, close, np.round(volume), splits
+
+    def generate_bars(self, ticker, n_bars, interval='1d', raw=False):
+        ticker = ticker.upper()
+        open_, high, low, close, volume, splits = self._path(ticker, interval, n_bars)
+        if raw:
+            # undo the split adjustment: bars before a split traded at the pre-split price
+            factor = np.cumprod(splits[::-1])[::-1]
+            factor = np.append(factor[1:], 1.0)
+            open_, high, low, close = (a * factor for a in (open_, high, low, close))
+        return pd.DataFrame({
+            'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+            'Dividends': 0.0, 'Stock Splits': np.where(splits == 1.0, 0.0, splits),
+        }, index=self._index(interval, n_bars))
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d',
+                auto_adjust=True, actions=True):
+        if interval != '1d' and interval not in INTERVAL_MINUTES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        origin = self.origin if interval == '1d' else self.intraday_origin
+        now = pd.Timestamp.now(tz=EXCHANGE_TZ)
+        end = min(_as_timestamp(end, EXCHANGE_TZ) if end is not None else now, now)
+        if start is None and period not in (None, 'max') and interval != '1d' and period.endswith('d'):
+            # intraday "Nd" means the last N sessions, like Yahoo
+            last_day = np.datetime64(end.date())
+            start = pd.Timestamp(np.busday_offset(last_day, 1 - int(period[:-1]), roll='backward'))
+        elif start is None:
+            start = _period_start(period, end)
+        start = _as_timestamp(start, EXCHANGE_TZ)
+
+        sessions = int(np.busday_count(np.datetime64(origin.date()), np.datetime64(end.date()) + 1))
+        if sessions <= 0:
+            return _empty_history()
+        n_bars = sessions if interval == '1d' else sessions * -(-390 // INTERVAL_MINUTES[interval])
+        frame = self.generate_bars(ticker, n_bars, interval)
+        lo = 0 if start is None else frame.index.searchsorted(start, side='left')
+        hi = frame.index.searchsorted(end, side='left' if interval == '1d' else 'right')
+        frame = frame.iloc[lo:hi]
+        if not auto_adjust:
+            frame.insert(4, 'Adj Close', frame['Close'])
+        return frame if actions else frame.drop(columns=['Dividends', 'Stock Splits'])
+
+    def info(self, ticker):
+        ticker = ticker.upper()
+        rng = self._rng(ticker, 'info')
+        last = float(self.history(ticker, period='5d')['Close'].iloc[-1])
+        shares = rng.uniform(1e8, 1e10)
+        eps = last / rng.uniform(8, 60)
+        return {
+            'symbol': ticker,
+            'shortName': f"{ticker} Synthetic Corp.",
+            'longBusinessSummary': f"{ticker} is a synthetic company generated for offline testing.",
+            'sector': rng.choice(['Technology', 'Healthcare', 'Financial Services', 'Energy', 'Industrials']),
+            'fullTimeEmployees': int(rng.integers(100, 200000)),
+            'website': f"https://example.com/{ticker.lower()}",
+            'currency': 'USD',
+            'currentPrice': round(last, 2),
+            'marketCap': int(last * shares),
+            'beta': round(rng.uniform(0.3, 2.5), 2),
+            'trailingEps': round(eps, 2),
+            'trailingPE': round(last / eps, 2),
+            'quickRatio': round(rng.uniform(0.3, 3.0), 3),
+            'revenuePerShare': round(rng.uniform(1, 100), 3),
+            'profitMargins': round(rng.uniform(-0.1, 0.4), 4),
+            'debtToEquity': round(rng.uniform(0, 250), 3),
+            'returnOnEquity': round(rng.uniform(-0.2, 0.6), 4),
+        }
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            kind = os.environ.get("EQUINOVA_PROVIDER", "yahoo").lower()
+            if kind == 'synthetic':
+                _provider = SyntheticProvider(seed=int(os.environ.get("EQUINOVA_SYNTHETIC_SEED", 0)))
+            elif kind == 'replay':
+                _provider = ReplayProvider()
+            elif kind == 'record':
+                _provider = RecordingProvider(YahooProvider())
+            else:
+                _provider = YahooProvider()
+        return _provider
+
+
+def set_provider(provider):
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from pages.utils.data_store import load_close_matrix
+from pages.utils.indicators import indicator_matrices
+from pages.utils.profiler import timed
+
+# Cross-sectional technical screen: RSI, MACD and SMA 50 for every ticker of a
+# dates x tickers close matrix in one pass of the array kernels, then one row
+# per ticker at its latest bar, filtered and sorted.
+OVERSOLD = 30
+OVERBOUGHT = 70
+BULLISH = 'Bullish'
+BEARISH = 'Bearish'
+# calendar days loaded by default: a little over WARMUP trading days, after which the
+# EMA seeds no longer show in the latest values (see indicators.WARMUP)
+LOOKBACK_DAYS = 400
+COLUMNS = ['Ticker', 'Date', 'Close', 'Change %', 'RSI', 'MACD', 'Signal', 'Histogram', 'SMA_50', 'vs SMA_50 %',
+           'MACD Cross']
+
+
+def screen_closes(closes, rsi_min=None, rsi_max=None, macd_cross=None, above_sma=None, sort_by='RSI',
+                  ascending=True, limit=None):
+    # closes: DataFrame indexed by date with one column per ticker
+    raw = closes.values.astype('float64')
+    has_value = ~np.isnan(raw)
+    # gaps after a ticker's first bar (e.g. a halted day) carry the last close, as one series per ticker would not have them
+    values = closes.ffill().values.astype('float64')
+    indicators = indicator_matrices(values)
+
+    # the latest bar of each ticker (names can stop trading before the last date)
+    last = len(raw) - 1 - np.argmax(has_value[::-1], axis=0)
+    prev = np.maximum(last - 1, 0)
+    cols = np.arange(raw.shape[1])
+    latest = {name: matrix[last, cols] for name, matrix in indicators.items()}
+    histogram_before = indicators['Histogram'][prev, cols]
+
+    close = values[last, cols]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (close / values[prev, cols] - 1) * 100
+        vs_sma = (close / latest['SMA_50'] - 1) * 100
+    cross = np.select([(histogram_before <= 0) & (latest['Histogram'] > 0),
+                       (histogram_before >= 0) & (latest['Histogram'] < 0)], [BULLISH, BEARISH], '')
+
+    result = pd.DataFrame({
+        'Ticker': closes.columns,
+        'Date': closes.index[last],
+        'Close': close,
+        'Change %': np.where(last > 0, change, np.nan),
+        'RSI': latest['RSI'],
+        'MACD': latest['MACD'],
+        'Signal': latest['Signal'],
+        'Histogram': latest['Histogram'],
+        'SMA_50': latest['SMA_50'],
+        'vs SMA_50 %': vs_sma,
+        'MACD Cross': cross,
+    }, columns=COLUMNS)
+
+    keep = has_value.any(axis=0)
+    if rsi_min is not None:
+        keep &= result['RSI'].values >= rsi_min
+    if rsi_max is not None:
+        keep &= result['RSI'].values <= rsi_max
+    if macd_cross is not None:
+        keep &= cross == macd_cross
+    if above_sma is not None:
+        keep &= (close > latest['SMA_50']) == above_sma
+    result = result[keep]
+
+    result = result.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+    result = result.reset_index(drop=True)
+    return result if limit is None else result.head(limit)
+
+
+@timed()
+def screen_universe(tickers, start=None, end=None, **filters):
+    if start is None:
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=LOOKBACK_DAYS)
+    closes = load_close_matrix(tickers, start=start, end=end)
+    return screen_closes(closes, **filters), closes.shape[1]
@@ -0,0 +1,80 @@
+import os
+import time
+import warnings
+
+import numpy as np
+from pages.utils.data_store import fingerprint
+from pages.utils.json_cache import JsonCache
+from pages.utils.profiler import timed
+
+# Differencing order for the forecaster: the smallest d whose d-th difference
+# passes the ADF test (and, optionally, also the KPSS test), capped at MAX_D.
+# All candidate differences live in one preallocated buffer: row k holds the
+# k-th difference, written from row k-1 in place, so no intermediate Series is
+# built. Tests run lazily from d = 0 and stop at the first stationary order.
+# Results are memoized by ticker and data fingerprint, in memory and in a JSON
+# cache shared with batch jobs (see json_cache), so unchanged data never reaches
+# the tests again.
+CACHE_DIR = os.environ.get("EQUINOVA_STATIONARITY_CACHE", os.path.join(".equinova", "stationarity"))
+MAX_D = 2
+ALPHA = 0.05
+
+_cache = JsonCache(CACHE_DIR)
+
+
+def differences(values, max_d=MAX_D):
+    # views of the 0th..max_d-th differences of values, backed by one buffer
+    values = np.asarray(values, dtype='float64').ravel()
+    n = len(values)
+    buffer = np.empty((max_d + 1, n))
+    buffer[0] = values
+    for k in range(1, max_d + 1):
+        np.subtract(buffer[k - 1, k:], buffer[k - 1, k - 1:-1], out=buffer[k, k:])
+    return [buffer[k, k:] for k in range(max_d + 1)]
+
+
+def adf_pvalue(values):
+    from statsmodels.tsa.stattools import adfuller
+    # rounded like stationary_check, so the chosen order is unchanged
+    return float(round(adfuller(values)[1], 3))
+
+
+def kpss_pvalue(values):
+    from statsmodels.tsa.stattools import kpss
+    with warnings.catch_warnings():
+        # KPSS p-values are interpolated from a table and clipped to [0.01, 0.1]
+        warnings.simplefilter('ignore')
+        return float(round(kpss(values, regression='c', nlags='auto')[1], 3))
+
+
+@timed()
+def analyze(data, ticker=None, max_d=MAX_D, alpha=ALPHA, use_kpss=False, use_cache=True):
+    started = time.perf_counter()
+    values = np.asarray(data, dtype='float64').ravel()
+    key = f"{ticker or ''}|{fingerprint(values)}|{max_d}|{alpha}|{'kpss' if use_kpss else 'adf'}"
+    cached = None
+    if use_cache:
+        cached = _cache.get(key, ticker)
+    if cached is not None:
+        return dict(cached, cached=True, seconds=time.perf_counter() - started)
+
+    adf, kpss_values = [], []
+    d = max_d
+    for k, series in enumerate(differences(values, max_d)):
+        adf.append(adf_pvalue(series))
+        stationary = adf[-1] <= alpha
+        if use_kpss:
+            kpss_values.append(kpss_pvalue(series))
+            stationary = stationary and kpss_values[-1] > alpha
+        if stationary:
+            d = k
+            break
+
+    result = {'d': d, 'adf_pvalues': adf, 'kpss_pvalues': kpss_values, 'capped': d == max_d and not stationary}
+    if use_cache:
+        _cache.put(key, result, ticker)
+    return dict(result, cached=False, seconds=time.perf_counter() - started)
+
+
+def differencing_order(data, ticker=None, max_d=MAX_D, alpha=ALPHA, use_kpss=False):
+    return analyze(data, ticker, max_d, alpha, use_kpss)['d']
@@ -0,0 +1,131 @@
+from collections import deque
+
+import numpy as np
+from pages.utils.anomaly import WINDOW, THRESHOLD, SPIKE, DIP
+
+# Streaming z-score detector for intraday bars. Each ticker owns one row of a
+# preallocated ring buffer plus running sums, so a new bar costs O(1) and the
+# memory footprint is fixed by `capacity` and `window` up front.
+# Values are stored relative to the ticker's first price to keep the running
+# sum of squares well conditioned, and the sums are rebuilt from the buffer
+# every `resync_every` bars so floating point error cannot accumulate.
+
+
+class StreamingZScore:
+    def __init__(self, window=WINDOW, threshold=THRESHOLD, capacity=10000, resync_every=1000,
+                 max_events=10000, on_event=None):
+        self.window = window
+        self.threshold = threshold
+        self.capacity = capacity
+        self.resync_every = resync_every
+        self.on_event = on_event
+        self.events = deque(maxlen=max_events)
+
+        self._slots = {}
+        self._tickers = []
+        self._buffer = np.zeros((capacity, window))
+        self._ref = np.zeros(capacity)
+        self._pos = np.zeros(capacity, dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._sum = np.zeros(capacity)
+        self._sumsq = np.zeros(capacity)
+        self._since_resync = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._tickers)
+
+    def _slot(self, ticker, price):
+        slot = self._slots.get(ticker)
+        if slot is None:
+            if len(self._tickers) >= self.capacity:
+                raise ValueError(f"Detector is full ({self.capacity} tickers)")
+            slot = len(self._tickers)
+            self._slots[ticker] = slot
+            self._tickers.append(ticker)
+            self._ref[slot] = price
+        return slot
+
+    def _push(self, slots, prices):
+        x = prices - self._ref[slots]
+        pos = self._pos[slots]
+        full = self._count[slots] >= self.window
+        old = np.where(full, self._buffer[slots, pos], 0.0)
+
+        self._buffer[slots, pos] = x
+        self._pos[slots] = (pos + 1) % self.window
+        self._count[slots] = np.minimum(self._count[slots] + 1, self.window)
+        self._sum[slots] += x - old
+        self._sumsq[slots] += x * x - old * old
+
+        self._since_resync[slots] += 1
+        stale = slots[self._since_resync[slots] >= self.resync_every]
+        if len(stale):
+            self._sum[stale] = self._buffer[stale].sum(axis=1)
+            self._sumsq[stale] = (self._buffer[stale] ** 2).sum(axis=1)
+            self._since_resync[stale] = 0
+
+        n = self.window
+        ready = self._count[slots] >= n
+        mean = self._sum[slots] / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (self._sumsq[slots] - self._sum[slots] * mean) / (n - 1)
+            zscore = (x - mean) / np.sqrt(np.maximum(var, 0.0))
+        return np.where(ready, zscore, np.nan), mean + self._ref[slots]
+
+    def _emit(self, slots, prices, zscore, mean, timestamp):
+        hits = np.flatnonzero(np.abs(zscore) > self.threshold)
+        for i in hits:
+            event = {
+                'ticker': self._tickers[slots[i]],
+                'timestamp': timestamp,
+                'price': float(prices[i]),
+                'mean': float(mean[i]),
+                'zscore': float(zscore[i]),
+                'anomaly': SPIKE if zscore[i] > 0 else DIP,
+            }
+            self.events.append(event)
+            if self.on_event is not None:
+                self.on_event(event)
+
+    def update(self, ticker, price, timestamp=None):
+        # scalar twin of _push: numpy calls on 1-element arrays cost more than the arithmetic
+        price = float(price)
+        slot = self._slot(ticker, price)
+        n = self.window
+        x = price - self._ref[slot]
+        pos = self._pos[slot]
+        old = self._buffer[slot, pos] if self._count[slot] >= n else 0.0
+
+        self._buffer[slot, pos] = x
+        self._pos[slot] = (pos + 1) % n
+        count = min(self._count[slot] + 1, n)
+        self._count[slot] = count
+        total = self._sum[slot] + x - old
+        sumsq = self._sumsq[slot] + x * x - old * old
+        self._since_resync[slot] += 1
+        if self._since_resync[slot] >= self.resync_every:
+            total = self._buffer[slot].sum()
+            sumsq = (self._buffer[slot] ** 2).sum()
+            self._since_resync[slot] = 0
+        self._sum[slot] = total
+        self._sumsq[slot] = sumsq
+
+        if count < n:
+            return float('nan')
+        mean = total / n
+        var = max((sumsq - total * mean) / (n - 1), 0.0)
+        zscore = (x - mean) / var ** 0.5 if var > 0 else float('nan')
+        if abs(zscore) > self.threshold:
+            self._emit(np.array([slot]), np.array([price]), np.array([zscore]),
+                       np.array([mean + self._ref[slot]]), timestamp)
+        return float(zscore)
+
+    def update_many(self, tickers, prices, timestamp=None):
+        # one cross-section of bars, e.g. every ticker's close for the same minute
+        prices = np.asarray(prices, dtype='float64')
+        slots = np.array([self._slot(t, p) for t, p in zip(tickers, prices)], dtype=np.int64)
+        if len(np.unique(slots)) != len(slots):
+            raise ValueError("Each ticker may appear only once per update_many call")
+        zscore, mean = self._push(slots, prices)
+        self._emit(slots, prices, zscore, mean, timestamp)
+        return zscore
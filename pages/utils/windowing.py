@@ -0,0 +1,68 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import dateutil.relativedelta as relativedelta
+from pages.utils.profiler import timed
+
+# Period windows for the chart builders. Price frames are indexed by a sorted
+# DatetimeIndex, so each period start is a binary search on the index and the
+# window is a positional slice of the frame (no mask, no copy).
+# The starts of all periods are computed together the first time a frame's
+# index is seen and reused by every chart drawn from the same frame.
+PERIODS = OrderedDict([
+    ('5d', relativedelta.relativedelta(days=-5)),
+    ('1mo', relativedelta.relativedelta(months=-1)),
+    ('6mo', relativedelta.relativedelta(months=-6)),
+    ('1y', relativedelta.relativedelta(years=-1)),
+    ('5y', relativedelta.relativedelta(years=-5)),
+    ('max', None),
+])
+MAX_DATASETS = 32
+
+_bounds = OrderedDict()
+_lock = threading.Lock()
+
+
+def _compute_bounds(index):
+    if not len(index):
+        return {period: 0 for period in PERIODS}
+    last = index[-1]
+    # a window keeps the bars strictly after `last + delta`, as filter_data always has
+    return {period: 0 if delta is None else int(index.searchsorted(last + delta, side='right'))
+            for period, delta in PERIODS.items()}
+
+
+def period_bounds(index):
+    # start position of every period in `index`, computed once per index object
+    key = id(index)
+    with _lock:
+        cached = _bounds.get(key)
+        if cached is not None and cached[0]() is index:
+            _bounds.move_to_end(key)
+            return cached[1]
+    bounds = _compute_bounds(index)
+    with _lock:
+        _bounds[key] = (weakref.ref(index), bounds)
+        while len(_bounds) > MAX_DATASETS:
+            _bounds.popitem(last=False)
+    return bounds
+
+
+def as_dated(dataframe):
+    # frames that still carry 'Date' as a column are moved onto a DatetimeIndex
+    if 'Date' in dataframe.columns:
+        dataframe = dataframe.set_index('Date')
+    if not dataframe.index.is_monotonic_increasing:
+        dataframe = dataframe.sort_index()
+    return dataframe
+
+
+def period_start(dataframe, num_period):
+    return period_bounds(dataframe.index).get(num_period, 0)
+
+
+@timed()
+def period_window(dataframe, num_period):
+    # rows of `dataframe` (sorted DatetimeIndex) that fall in the period, as a slice of the frame
+    return dataframe.iloc[period_start(dataframe, num_period):]